@@ -0,0 +1,93 @@
+"""
+Compara tempo de treino e acurácia dos backends do modelo avançado.
+
+No clima sintético a área plantada não depende das variáveis climáticas, então
+MAE e R² servem apenas para conferir que os backends chegam a erros parecidos.
+O teste usa os mesmos anos separados por ``advanced_prediction``.
+
+Uso:
+    python benchmarks/bench_advanced_prediction.py --scale 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sklearn.metrics import mean_absolute_error, r2_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import (  # noqa: E402
+    _holdout_mask,
+    build_regressor,
+    keyed_merge,
+    weather_means,
+)
+from data_cleaning import load_cotton_data, load_weather_data  # noqa: E402
+from synthetic import (  # noqa: E402
+    station_regions,
+    write_cotton_workbook,
+    write_weather_csv,
+)
+
+FEATURES = ["temp_avg", "rain_max", "hum_max", "wind_avg"]
+
+CONFIGS = [
+    ("random_forest (1 núcleo)", "random_forest", 1),
+    ("random_forest (todos)", "random_forest", -1),
+    ("hist_gradient_boosting", "hist_gradient_boosting", None),
+]
+
+
+def station_year_table(tmp, scale):
+    """
+    Monta a tabela estação × ano (médias climáticas e área plantada da UF).
+
+    Usa o CSV climático e a planilha sintéticos (synthetic.py); na escala 1×
+    são cerca de 15 mil linhas.
+    """
+    weather_path = os.path.join(tmp, "weather_sum_all.csv")
+    cotton_path = os.path.join(tmp, "algodao.xlsx")
+    write_weather_csv(weather_path, scale)
+    write_cotton_workbook(cotton_path, scale)
+
+    weather = load_weather_data(weather_path)
+    means = weather_means(weather, ["Ano", "ESTACAO"])
+    regions = means["ESTACAO"].astype(str).map(station_regions(scale))
+    means = means.assign(**{"Região/UF": regions})
+    cotton = load_cotton_data(cotton_path, use_cache=False)
+    return keyed_merge(
+        means, cotton, on=["Ano", "Região/UF"], validate="many_to_one"
+    ).rename(columns={"Area_Plantada": "Area_Planted"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--estimators", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = station_year_table(tmp, args.scale)
+    # Mesma divisão por ano usada por advanced_prediction
+    test_rows = _holdout_mask(data["Ano"])
+    X, y = data[FEATURES], data["Area_Planted"]
+    X_train, y_train = X[~test_rows], y[~test_rows]
+    X_test, y_test = X[test_rows], y[test_rows]
+
+    print(f"\nTabela: {len(data)} linhas, {args.estimators} árvores/iterações")
+    print(f"{'backend':<28}{'treino (s)':>12}{'MAE':>10}{'R²':>8}")
+    for label, backend, n_jobs in CONFIGS:
+        model = build_regressor(backend, args.estimators, n_jobs=n_jobs)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        elapsed = time.perf_counter() - start
+        y_pred = model.predict(X_test)
+        mae = mean_absolute_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+        print(f"{label:<28}{elapsed:>12.2f}{mae:>10.1f}{r2:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
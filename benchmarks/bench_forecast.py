@@ -0,0 +1,63 @@
+"""
+Compara a previsão por UF em laço (uma regressão por série) com o ajuste em lote.
+
+As séries vêm da planilha sintética da CONAB (synthetic.py): na escala 1×, 35
+regiões com as safras de 1976/77 a 2024/25.
+
+Uso:
+    python benchmarks/bench_forecast.py --scale 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import (  # noqa: E402
+    predict_planted_area,
+    predict_planted_area_by_region,
+)
+from data_cleaning import load_cotton_data  # noqa: E402
+from synthetic import write_cotton_workbook  # noqa: E402
+
+
+def loop_forecast(cotton, years_to_consider):
+    return [
+        predict_planted_area(group, years_to_consider=years_to_consider)
+        for _, group in cotton.groupby("Região/UF")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--window", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "algodao.xlsx")
+        write_cotton_workbook(path, args.scale)
+        cotton = load_cotton_data(path, use_cache=False)
+    series = cotton["Região/UF"].nunique()
+    one = cotton[cotton["Região/UF"] == cotton["Região/UF"].iloc[0]]
+
+    modes = {
+        "1 série (sklearn)": lambda: predict_planted_area(one, args.window),
+        f"{series} séries em laço": lambda: loop_forecast(cotton, args.window),
+        f"{series} séries em lote": lambda: predict_planted_area_by_region(
+            cotton, args.window
+        ),
+    }
+
+    print(f"\n{'modo':<28}{'tempo (ms)':>12}")
+    for mode, func in modes.items():
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{mode:<28}{elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compara o tamanho do mapa coroplético e o tempo de preparo por tolerância.
+
+Para cada tolerância mede o GeoJSON compacto (primeira chamada e chamada em
+cache) e o HTML gerado pelo folium, contra o arquivo original sem simplificação.
+
+Uso:
+    python benchmarks/bench_map_payload.py --geojson src/data/geo/br_states.json
+"""
+import argparse
+import os
+import sys
+import time
+
+import folium
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from visualization import _map_geojson, load_map_geojson  # noqa: E402
+
+TOLERANCES = (0.0, 0.005, 0.01, 0.05)
+
+
+def html_size(geo_data):
+    m = folium.Map(location=[-14.235, -51.9253], zoom_start=4)
+    folium.GeoJson(geo_data).add_to(m)
+    return len(m.get_root().render().encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--geojson", default="src/data/geo/br_states.json")
+    args = parser.parse_args()
+
+    print(f"\narquivo original: {os.path.getsize(args.geojson) / 1024:.1f} KB")
+    print(f"HTML original: {html_size(args.geojson) / 1024:.1f} KB")
+    print(
+        f"\n{'tolerância':>10}{'1ª (ms)':>10}{'cache (ms)':>12}"
+        f"{'GeoJSON (KB)':>14}{'HTML (KB)':>11}"
+    )
+    for tolerance in TOLERANCES:
+        _map_geojson.cache_clear()
+        start = time.perf_counter()
+        payload = load_map_geojson(args.geojson, tolerance=tolerance)
+        first = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        load_map_geojson(args.geojson, tolerance=tolerance)
+        cached = (time.perf_counter() - start) * 1000
+        print(
+            f"{tolerance:>10}{first:>10.1f}{cached:>12.3f}"
+            f"{len(payload) / 1024:>14.1f}{html_size(payload) / 1024:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
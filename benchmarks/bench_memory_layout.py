@@ -0,0 +1,111 @@
+"""
+Compara o consumo de memória por etapa com e sem o esquema de tipos compactos.
+
+Sem --weather, gera um CSV sintético no formato de weather_sum_all.csv; com
+--weather, mede o arquivo real de estações.
+
+Uso:
+    python benchmarks/bench_memory_layout.py --scale 2
+    python benchmarks/bench_memory_layout.py --weather src/weather_sum_all.csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import keyed_merge, weather_means  # noqa: E402
+from data_cleaning import (  # noqa: E402
+    _derive_weather_columns,
+    load_cotton_data,
+    load_weather_data,
+    memory_report,
+)
+from synthetic import write_weather_csv  # noqa: E402
+
+DEFAULT_COTTON = os.path.join(
+    os.path.dirname(__file__), "..", "src", "AlgodoSerieHist.xlsx"
+)
+
+
+def widen(data):
+    """
+    Reproduz os tipos largos anteriores (object, int64 e float64).
+    """
+    dtypes = {}
+    for col, dtype in data.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = object
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = "int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+    return data.astype(dtypes)
+
+
+def pipeline(weather, cotton, station_to_region, merge):
+    """
+    Executa as etapas de junção do app e devolve {etapa: DataFrame}.
+    """
+    regions = weather["ESTACAO"].map(station_to_region)
+    weather = weather.assign(**{"Região/UF": regions})
+    seasonal = weather_means(weather, ["Ano", "Região/UF", "Estacao"])
+    annual = weather_means(weather, ["Ano", "Região/UF"])
+    if merge is pd.merge:
+        seasonal, annual = widen(seasonal), widen(annual)
+    return {
+        "algodão": cotton,
+        "clima diário": weather,
+        "médias sazonais": seasonal,
+        "junção sazonal": merge(cotton, seasonal, on=["Ano", "Região/UF"]),
+        "junção anual": merge(cotton, annual, on=["Ano", "Região/UF"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--weather", default=None)
+    parser.add_argument("--cotton", default=DEFAULT_COTTON)
+    args = parser.parse_args()
+
+    cotton = load_cotton_data(args.cotton, use_cache=False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.weather
+        if path is None:
+            path = os.path.join(tmp, "weather_sum_all.csv")
+            write_weather_csv(path, args.scale)
+
+        wide_weather = widen(_derive_weather_columns(pd.read_csv(path)))
+        compact_weather = load_weather_data(path)
+
+    # Distribui as estações entre as UFs da planilha, em rodízio
+    stations = np.sort(compact_weather["ESTACAO"].unique().astype(str))
+    regions = cotton["Região/UF"].cat.categories
+    station_to_region = dict(zip(stations, np.resize(regions, len(stations))))
+
+    wide = memory_report(
+        pipeline(wide_weather, widen(cotton), station_to_region, pd.merge)
+    )
+    compact = memory_report(
+        pipeline(compact_weather, cotton, station_to_region, keyed_merge)
+    )
+
+    report = wide[["Etapa", "Linhas"]].assign(
+        **{
+            "Largo (MB)": wide["Bytes"] / 1024**2,
+            "Compacto (MB)": compact["Bytes"] / 1024**2,
+            "Redução (%)": 100 * (1 - compact["Bytes"] / wide["Bytes"]),
+        }
+    )
+    print()
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
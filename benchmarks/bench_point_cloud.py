@@ -0,0 +1,88 @@
+"""
+Mede o tempo de renderização e o tamanho do gráfico de dispersão por número de
+pontos: seaborn (PNG), Plotly com todos os pontos e point_cloud_figure.
+
+Uso:
+    python benchmarks/bench_point_cloud.py --points 1000 10000 100000 1000000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.express as px  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from visualization import point_cloud_figure  # noqa: E402
+
+COLUMNS = ["Temperatura Média (°C)", "Área Plantada (ha)", "Precipitação (mm)"]
+
+
+def seaborn_png(data):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.scatterplot(
+        x=COLUMNS[0],
+        y=COLUMNS[1],
+        data=data,
+        hue=COLUMNS[2],
+        size=COLUMNS[2],
+        sizes=(50, 200),
+        alpha=0.7,
+        ax=ax,
+    )
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def plotly_all(data):
+    return px.scatter(data, x=COLUMNS[0], y=COLUMNS[1], color=COLUMNS[2]).to_json()
+
+
+def plotly_binned(data):
+    return point_cloud_figure(data, COLUMNS[0], COLUMNS[1], COLUMNS[2]).to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--skip-seaborn-above", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    modes = {
+        "seaborn (PNG)": seaborn_png,
+        "Plotly, todos os pontos": plotly_all,
+        "point_cloud_figure": plotly_binned,
+    }
+    print(f"\n{'modo':<26}{'pontos':>10}{'tempo (s)':>12}{'KB':>10}")
+    for n in args.points:
+        data = pd.DataFrame(
+            {
+                COLUMNS[0]: rng.normal(25, 5, n),
+                COLUMNS[1]: rng.normal(1000, 200, n),
+                COLUMNS[2]: rng.normal(100, 30, n),
+            }
+        )
+        for mode, func in modes.items():
+            if mode.startswith("seaborn") and n > args.skip_seaborn_above:
+                continue
+            start = time.perf_counter()
+            payload = func(data)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<26}{n:>10}{elapsed:>12.2f}{len(payload) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
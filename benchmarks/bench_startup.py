@@ -0,0 +1,117 @@
+"""
+Perfil de inicialização do app: tempo de importação por módulo e tempo até a
+primeira renderização.
+
+Executa o app num processo novo (com ``python -X importtime``) pelo
+``streamlit.testing``: a primeira execução do script corresponde à primeira
+pintura da aba inicial; em seguida, mede a primeira visita a cada aba, que
+inclui as importações feitas sob demanda. Com --json, grava os resultados para
+comparação entre versões.
+
+O app lê o clima de um CSV sintético (synthetic.py) com ``--linhas`` linhas,
+já ingerido num repositório temporário (WEATHER_SOURCE_DIR e
+WEATHER_STORE_DIR): nada é baixado do Google Drive e o repositório de
+``src/`` não é alterado. Requer streamlit >= 1.28 (``streamlit.testing``).
+
+Uso:
+    python benchmarks/bench_startup.py --top 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from synthetic import write_weather_csv  # noqa: E402
+from weather_store import (  # noqa: E402
+    WEATHER_BASE_FILE,
+    LocalDirectorySource,
+    sync_weather_store,
+)
+
+# Script executado no processo novo; imprime os tempos em JSON na última linha
+RUNNER = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=600)
+app.run()
+result = {"primeira_pintura": time.perf_counter() - start, "abas": {}}
+for tab in app.radio(key="active_tab").options if sys.argv[1] == "1" else []:
+    tab_start = time.perf_counter()
+    app.radio(key="active_tab").set_value(tab).run()
+    result["abas"][tab] = time.perf_counter() - tab_start
+print(json.dumps(result))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_times(stderr):
+    """
+    Soma o tempo cumulativo (s) das importações de primeiro nível por pacote.
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None or len(match.group(3)) != 1:
+            continue
+        package = match.group(4).split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(match.group(2)) / 1e6
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--sem-abas", action="store_true")
+    parser.add_argument("--json", default=None)
+    parser.add_argument("--linhas", type=int, default=200_000)
+    args = parser.parse_args()
+
+    visit_tabs = "0" if args.sem_abas else "1"
+    with tempfile.TemporaryDirectory() as tmp:
+        # Repositório já sincronizado, como numa abertura do app após a primeira
+        source_dir = os.path.join(tmp, "origem")
+        store_dir = os.path.join(tmp, "repositorio")
+        os.makedirs(source_dir)
+        write_weather_csv(
+            os.path.join(source_dir, WEATHER_BASE_FILE), rows=args.linhas
+        )
+        sync_weather_store(LocalDirectorySource(source_dir), store_dir)
+
+        env = {
+            **os.environ,
+            "WEATHER_SOURCE_DIR": source_dir,
+            "WEATHER_STORE_DIR": store_dir,
+        }
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", RUNNER, visit_tabs],
+            cwd=SRC_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["importacoes"] = import_times(completed.stderr)
+
+    print(f"\n{'módulo':<28}{'importação (s)':>16}")
+    for package, seconds in list(result["importacoes"].items())[: args.top]:
+        print(f"{package:<28}{seconds:>16.3f}")
+    print(f"\nprimeira pintura (aba inicial): {result['primeira_pintura']:.2f} s")
+    for tab, seconds in result["abas"].items():
+        print(f"  primeira visita a {tab:<34}{seconds:>8.2f} s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
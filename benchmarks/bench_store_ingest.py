@@ -0,0 +1,49 @@
+"""
+Mede o tempo e o pico de memória da ingestão no repositório climático conforme
+o número de linhas do CSV cresce, com blocos de tamanho fixo.
+
+As estações são as mesmas em todos os tamanhos (escala 1×); com a
+deduplicação feita contra as partições em disco, o pico deve depender do
+tamanho do bloco e do pré-agregado por estação (estações × anos, que para de
+crescer quando todas as combinações aparecem), e não do tamanho do arquivo. O
+tracemalloc não inclui buffers do Arrow.
+
+Uso:
+    python benchmarks/bench_store_ingest.py --linhas 500000 1000000 2000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthetic import measure, write_weather_csv  # noqa: E402
+from weather_store import ingest_weather_file  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--linhas", type=int, nargs="+", default=[500_000, 1_000_000, 2_000_000]
+    )
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"\n{'linhas':>10}{'tempo (s)':>12}{'pico (MB)':>12}{'s/milhão':>10}")
+    for rows in args.linhas:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "weather_sum_all.csv")
+            write_weather_csv(path, rows=rows)
+            store_dir = os.path.join(tmp, "repositorio")
+            elapsed, peak = measure(
+                lambda: ingest_weather_file(
+                    path, store_dir, chunksize=args.chunksize
+                )
+            )
+        per_million = elapsed / rows * 1e6
+        print(f"{rows:>10}{elapsed:>12.2f}{peak:>12.1f}{per_million:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
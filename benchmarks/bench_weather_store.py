@@ -0,0 +1,75 @@
+"""
+Compara a leitura do CSV completo com consultas ao repositório particionado.
+
+A consulta de referência é a de uma aba típica: anos 2015–2023, apenas MT e três
+colunas. O pico medido pelo tracemalloc não inclui buffers do Arrow, por isso o
+tamanho do DataFrame resultante também é reportado.
+
+Uso:
+    python benchmarks/bench_weather_store.py --scale 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_cleaning import load_weather_data  # noqa: E402
+from synthetic import measure, station_codes, write_weather_csv  # noqa: E402
+from weather_store import ingest_weather_file, query_weather_store  # noqa: E402
+
+UFS = ["MT", "BA", "GO", "MS", "MG", "MA", "PI", "TO", "PR", "SP"]
+YEARS = range(2015, 2024)
+COLUMNS = ["DATA", "ESTACAO", "temp_avg"]
+
+
+def full_load(path, station_to_region):
+    data = load_weather_data(path)
+    in_region = data["ESTACAO"].astype(str).map(station_to_region) == "MT"
+    return data.loc[data["Ano"].isin(YEARS) & in_region, COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "weather_sum_all.csv")
+        csv_rows = write_weather_csv(path, args.scale)
+
+        stations = station_codes(args.scale)
+        station_to_region = dict(zip(stations, np.resize(UFS, len(stations))))
+
+        by_year = os.path.join(tmp, "por_ano")
+        by_region = os.path.join(tmp, "por_ano_uf")
+        ingest_weather_file(path, by_year)
+        ingest_weather_file(path, by_region, station_to_region=station_to_region)
+
+        results = {}
+        modes = {
+            "CSV completo": lambda: full_load(path, station_to_region),
+            "partições por ano": lambda: query_weather_store(
+                by_year, YEARS, ["MT"], COLUMNS, station_to_region
+            ),
+            "partições por ano e UF": lambda: query_weather_store(
+                by_region, YEARS, ["MT"], COLUMNS
+            ),
+        }
+        for mode, func in modes.items():
+            output = {}
+            elapsed, peak = measure(lambda: output.update(data=func()))
+            size = output["data"].memory_usage(deep=True).sum() / 1024**2
+            results[mode] = (elapsed, peak, len(output["data"]), size)
+
+    print(f"\nCSV: {csv_rows} linhas; consulta: 2015–2023, MT, {COLUMNS}")
+    print(f"{'modo':<26}{'tempo (s)':>12}{'pico (MB)':>12}{'linhas':>10}{'MB':>8}")
+    for mode, (elapsed, peak, rows, size) in results.items():
+        print(f"{mode:<26}{elapsed:>12.2f}{peak:>12.1f}{rows:>10}{size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Suíte de benchmarks do pipeline em dados sintéticos de 1×, 10× e 100×.
+
+Para cada escala gera o CSV climático e a planilha da CONAB (synthetic.py) e
+mede as etapas do app: ingestão do CSV no repositório climático, consulta ao
+repositório (dados diários e cubo reagregado do pré-agregado por estação),
+carga do algodão, agregação (cubo climático), junção, correlação, previsão
+(polinomial por UF e Monte Carlo) e treino do modelo avançado. A leitura direta
+do CSV (``carga_clima``, via ``load_weather_data``) fica apenas como referência
+para a ingestão; as etapas seguintes usam os dados lidos do repositório, como
+o app. Cada etapa é repetida ``--repeat`` vezes e o menor tempo é
+mantido; o pico de memória vem do tracemalloc (não inclui buffers do Arrow).
+
+Os resultados são gravados em JSON (``benchmarks/results/`` por padrão), com o
+commit e as versões das bibliotecas, e podem ser comparados com uma execução
+anterior via --compare.
+
+Uso:
+    python benchmarks/run_suite.py --scales 1 10
+    python benchmarks/run_suite.py --scales 1 --compare benchmarks/results/base.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from analysis import (  # noqa: E402
+    _MODEL_CACHE,
+    advanced_prediction,
+    analyze_climatic_influences,
+    analyze_historical_trends,
+    build_weather_cube,
+    correlation_matrix,
+    keyed_merge,
+    monte_carlo_simulation,
+    predict_planted_area_by_region,
+    query_weather_cube,
+    rollup_weather_cube,
+)
+from data_cleaning import load_cotton_data, load_weather_data  # noqa: E402
+from synthetic import (  # noqa: E402
+    measure,
+    station_regions,
+    write_cotton_workbook,
+    write_weather_csv,
+)
+from weather_store import (  # noqa: E402
+    WEATHER_BASE_FILE,
+    LocalDirectorySource,
+    load_station_cube,
+    query_weather_store,
+    sync_weather_store,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Variação (e diferença mínima, para ignorar ruído em etapas rápidas) acima da
+# qual a comparação marca a etapa como regressão
+REGRESSION_THRESHOLD = 1.10
+REGRESSION_MIN_SECONDS = 0.05
+
+
+def run_stages(tmp, scale, repeat):
+    """
+    Gera os dados da escala e mede cada etapa; devolve uma lista de resultados.
+    """
+    # O CSV fica num diretório próprio, que serve de origem do repositório
+    source_dir = os.path.join(tmp, "origem")
+    store_dir = os.path.join(tmp, "repositorio")
+    os.makedirs(source_dir)
+    weather_path = os.path.join(source_dir, WEATHER_BASE_FILE)
+    cotton_path = os.path.join(tmp, f"algodao_{scale}x.xlsx")
+    weather_rows = write_weather_csv(weather_path, scale)
+    write_cotton_workbook(cotton_path, scale)
+    station_to_region = station_regions(scale)
+
+    state = {}
+
+    def load_weather():
+        load_weather_data(weather_path)
+
+    def ingest_weather():
+        # Repositório vazio a cada repetição, para medir a ingestão completa
+        shutil.rmtree(store_dir, ignore_errors=True)
+        sync_weather_store(
+            LocalDirectorySource(source_dir),
+            store_dir,
+            station_to_region=station_to_region,
+        )
+
+    def query_weather():
+        state["weather"] = query_weather_store(store_dir)
+        cube = rollup_weather_cube(load_station_cube(store_dir), station_to_region)
+        state["regional"] = query_weather_cube(cube, by=["Ano", "Região/UF"])
+
+    def load_cotton():
+        state["cotton"] = load_cotton_data(cotton_path, use_cache=False)
+
+    def aggregate():
+        cube = build_weather_cube(state["weather"], station_to_region)
+        query_weather_cube(cube, by=["Ano", "Região/UF"])
+
+    def merge():
+        keyed_merge(
+            state["cotton"],
+            state["regional"],
+            on=["Ano", "Região/UF"],
+            validate="one_to_one",
+        )
+
+    def correlate():
+        corr_matrix = correlation_matrix(state["cotton"], state["regional"])
+        analyze_climatic_influences(
+            state["cotton"], state["regional"], corr_matrix=corr_matrix
+        )
+
+    def forecast():
+        predict_planted_area_by_region(state["cotton"])
+        historical = analyze_historical_trends(state["cotton"])
+        monte_carlo_simulation(historical, 10_000 * scale, 10, model="ar1", seed=42)
+
+    def train():
+        # Registro de modelos vazio a cada repetição, para medir o treino
+        registry_dir = os.path.join(tmp, "modelos")
+        shutil.rmtree(registry_dir, ignore_errors=True)
+        _MODEL_CACHE.clear()
+        advanced_prediction(
+            state["cotton"].rename(columns={"Area_Plantada": "Area_Planted"}),
+            state["regional"],
+            registry_dir=registry_dir,
+        )
+
+    # Etapa -> (função medida, linhas de entrada relatadas)
+    stages = {
+        "carga_clima": (load_weather, lambda: weather_rows),
+        "clima_ingestao": (ingest_weather, lambda: weather_rows),
+        "clima_consulta": (query_weather, lambda: len(state["weather"])),
+        "carga_algodao": (load_cotton, lambda: len(state["cotton"])),
+        "agregacao": (aggregate, lambda: len(state["weather"])),
+        "juncao": (merge, lambda: len(state["cotton"])),
+        "correlacao": (correlate, lambda: len(state["cotton"])),
+        "previsao": (forecast, lambda: len(state["cotton"])),
+        "treino": (train, lambda: len(state["cotton"])),
+    }
+    results = []
+    for stage, (func, rows) in stages.items():
+        runs = [measure(func) for _ in range(repeat)]
+        results.append(
+            {
+                "etapa": stage,
+                "escala": scale,
+                "linhas": rows(),
+                "segundos": min(elapsed for elapsed, _ in runs),
+                "pico_mb": max(peak for _, peak in runs),
+            }
+        )
+        print(f"{scale:>4}× {stage:<16}{results[-1]['segundos']:>10.3f} s")
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(results, baseline_path):
+    """
+    Mostra a razão entre os tempos atuais e os de uma execução anterior.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (r["etapa"], r["escala"]): r["segundos"]
+            for r in json.load(f)["resultados"]
+        }
+    print(
+        f"\n{'etapa':<16}{'escala':>8}{'antes (s)':>12}{'agora (s)':>12}"
+        f"{'razão':>8}"
+    )
+    for r in results:
+        before = baseline.get((r["etapa"], r["escala"]))
+        if before is None:
+            continue
+        ratio = r["segundos"] / before if before else float("nan")
+        slower = r["segundos"] - before > REGRESSION_MIN_SECONDS
+        flag = "  regressão" if ratio > REGRESSION_THRESHOLD and slower else ""
+        print(
+            f"{r['etapa']:<16}{r['escala']:>7}×{before:>12.3f}"
+            f"{r['segundos']:>12.3f}{ratio:>8.2f}{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            results.extend(run_stages(tmp, scale, args.repeat))
+
+    report = {"metadados": metadata(), "resultados": results}
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = report["metadados"]["commit"]
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
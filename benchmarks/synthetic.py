@@ -0,0 +1,138 @@
+"""
+Geradores de dados sintéticos nos formatos reais do projeto, para benchmarks.
+
+- Clima: CSV no formato de weather_sum_all.csv ("DATA (YYYY-MM-DD)", "ESTACAO"
+  e as variáveis climáticas), escrito em blocos para não depender da memória.
+- Algodão: planilha no layout largo da série histórica da CONAB (um bloco
+  "REGIÃO/UF" × safras "1976/77" por aba), lida por ``load_cotton_series``.
+
+O tamanho é dado por uma escala: 1× corresponde a WEATHER_BASE_ROWS linhas de
+clima e às COTTON_BASE_REGIONS linhas por aba da planilha real; as estações e
+as regiões crescem junto com a escala, mantendo a proporção de registros por
+estação e de estações por região.
+
+``measure`` é o cronômetro comum dos benchmarks (tempo e pico do tracemalloc).
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+WEATHER_BASE_ROWS = 1_000_000
+WEATHER_BASE_STATIONS = 600
+COTTON_BASE_REGIONS = 35
+COTTON_YEARS = range(1976, 2025)
+WEATHER_START = "2000-01-01"
+WEATHER_DAYS = 9132  # 2000-01-01 a 2024-12-31
+
+CLIMATE_COLS = [
+    "temp_max", "temp_avg", "temp_min", "hum_max", "hum_min",
+    "rain_max", "rad_max", "wind_avg", "wind_max",
+]
+
+# Abas da planilha da CONAB geradas (as lidas por data_cleaning.CONAB_SERIES)
+COTTON_SHEETS = {
+    "Área": ("Série Histórica de Área Plantada", "Em mil hectares", 30.0),
+    "Produção Algodão em Caroço": (
+        "Série Histórica de Produção",
+        "Em mil toneladas",
+        90.0,
+    ),
+    "Produtividade Algodão em Caroço": (
+        "Série Histórica de Produtividade",
+        "Em kg/ha",
+        3000.0,
+    ),
+}
+
+
+def station_codes(scale=1):
+    return [f"A{i:04d}" for i in range(1, WEATHER_BASE_STATIONS * scale + 1)]
+
+
+def region_names(scale=1):
+    return [f"UF{i:04d}" for i in range(COTTON_BASE_REGIONS * scale)]
+
+
+def station_regions(scale=1):
+    """
+    Distribui as estações entre as regiões sintéticas, em rodízio.
+    """
+    stations, regions = station_codes(scale), region_names(scale)
+    return dict(zip(stations, np.resize(regions, len(stations))))
+
+
+def write_weather_csv(path, scale=1, seed=42, chunksize=1_000_000, rows=None):
+    """
+    Gera o CSV climático com ``WEATHER_BASE_ROWS * scale`` linhas.
+
+    Cada linha é um par (dia, estação) distinto, em ordem cronológica, como no
+    arquivo real; os valores seguem uma sazonalidade anual com ruído. ``rows``
+    fixa outro número de linhas para as mesmas estações da escala (até
+    ``WEATHER_DAYS`` por estação).
+    """
+    rng = np.random.default_rng(seed)
+    rows = WEATHER_BASE_ROWS * scale if rows is None else rows
+    stations = np.array(station_codes(scale))
+    dates = pd.date_range(WEATHER_START, periods=WEATHER_DAYS, freq="D")
+    labels = dates.strftime("%Y-%m-%d").to_numpy()
+    seasonal = 4 * np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - 15) / 365.25)
+
+    # Índices (dia, estação) sem repetição, espaçados ao longo do período
+    pairs = np.linspace(0, WEATHER_DAYS * len(stations) - 1, rows).astype(np.int64)
+
+    for start in range(0, rows, chunksize):
+        index = pairs[start : start + chunksize]
+        day, station = np.divmod(index, len(stations))
+        chunk = pd.DataFrame(
+            {"DATA (YYYY-MM-DD)": labels[day], "ESTACAO": stations[station]}
+        )
+        for col in CLIMATE_COLS:
+            chunk[col] = (20 + seasonal[day] + rng.normal(0, 3, len(index))).round(1)
+        first = start == 0
+        chunk.to_csv(path, mode="w" if first else "a", header=first, index=False)
+    return rows
+
+
+def write_cotton_workbook(path, scale=1, seed=42):
+    """
+    Gera a planilha da CONAB com ``COTTON_BASE_REGIONS * scale`` regiões por aba.
+    """
+    rng = np.random.default_rng(seed)
+    regions = region_names(scale)
+    years = list(COTTON_YEARS)
+    harvests = [f"{year}/{(year + 1) % 100:02d}" for year in years]
+    t = np.arange(len(years))
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name, (title, unit, level) in COTTON_SHEETS.items():
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append([None])
+        sheet.append(["ALGODÃO - BRASIL"])
+        sheet.append([title])
+        sheet.append([f"Safras {harvests[0]} a {harvests[-1]}"])
+        sheet.append([unit])
+        sheet.append(["REGIÃO/UF"] + harvests)
+        trend = rng.normal(1.0, 0.5, (len(regions), 1)) * t / len(years)
+        noise = rng.normal(0, 0.1, (len(regions), len(years)))
+        values = np.maximum(level * (1 + trend + noise), 0).round(1)
+        for region, row in zip(regions, values):
+            sheet.append([region] + row.tolist())
+        sheet.append(["Legenda: dados sintéticos."])
+        sheet.append(["Fonte: benchmarks/synthetic.py"])
+    workbook.save(path)
+    return len(regions)
+
+
+def measure(func):
+    """
+    Executa ``func`` e devolve (segundos, pico de memória em MB do tracemalloc).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024**2
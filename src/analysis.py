@@ -1,29 +1,429 @@
+import copy
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
 import numpy as np
-import streamlit as st
-from deap import base, creator, tools, algorithms
+
+from data_cleaning import CALENDAR_COLUMNS, apply_compact_schema
+
+
+# Mapeamento padrão de estações para regiões, usado quando não há catálogo de
+# estações com coordenadas (ver assign_stations_to_regions)
+STATION_TO_REGION = {
+    "A001": "NORTE",
+    "A002": "NORDESTE",
+    # Outros mapeamentos
+}
+
+
+# Distância máxima (km) até a UF mais próxima para estações fora de todos os
+# polígonos (litoral, ilhas, limites simplificados) e projeção usada na medida
+MAX_STATION_DISTANCE_KM = 50
+STATION_DISTANCE_CRS = "EPSG:5880"  # SIRGAS 2000 / Brazil Polyconic (metros)
+
+
+@lru_cache(maxsize=4)
+def _load_state_geometries(geojson_path: str, mtime: float, id_field: str):
+    """
+    Carrega os polígonos das UFs e constrói o índice espacial (uma vez por arquivo).
+    """
+    import geopandas as gpd
+
+    states = gpd.read_file(geojson_path)[[id_field, "geometry"]]
+    states = states.rename(columns={id_field: "Região/UF"})
+    if states.crs is None:
+        states = states.set_crs(epsg=4326)
+    else:
+        states = states.to_crs(epsg=4326)
+
+    # Acessar o sindex força a construção da STRtree já na primeira carga
+    states.sindex
+    return states
+
+
+def assign_stations_to_regions(
+    stations: pd.DataFrame,
+    geojson_path: str,
+    id_field: str = "id",
+    max_distance_km: float = MAX_STATION_DISTANCE_KM,
+) -> pd.Series:
+    """
+    Associa cada estação à UF que a contém, via ponto-em-polígono vetorizado.
+
+    Usa o mesmo GeoJSON de ``plot_regional_map``. Estações fora de todos os
+    polígonos (ex.: litoral, ilhas) recebem a UF mais próxima, desde que a no
+    máximo ``max_distance_km``; as mais distantes (ex.: coordenadas erradas ou
+    fora do país) ficam sem UF e são listadas em um aviso.
+
+    Returns:
+        pd.Series: Região/UF indexada pelo código da estação, pronta para
+        ``weather_data["ESTACAO"].map(...)``.
+    """
+    import geopandas as gpd
+
+    try:
+        states = _load_state_geometries(
+            geojson_path, os.path.getmtime(geojson_path), id_field
+        )
+        points = gpd.GeoDataFrame(
+            stations[["ESTACAO"]].reset_index(drop=True),
+            geometry=gpd.points_from_xy(stations["LONGITUDE"], stations["LATITUDE"]),
+            crs="EPSG:4326",
+        )
+
+        joined = gpd.sjoin(points, states, how="left", predicate="within")
+        regions = joined.loc[~joined.index.duplicated(), "Região/UF"]
+
+        missing = regions.isna()
+        if missing.any():
+            nearest = gpd.sjoin_nearest(
+                points[missing].to_crs(STATION_DISTANCE_CRS),
+                states.to_crs(STATION_DISTANCE_CRS),
+                how="left",
+                max_distance=max_distance_km * 1000,
+            )
+            nearest = nearest.loc[~nearest.index.duplicated(), "Região/UF"]
+            regions = regions.where(~missing, nearest)
+
+        unassigned = points.loc[regions.isna().to_numpy(), "ESTACAO"].astype(str)
+        if len(unassigned):
+            warnings.warn(
+                f"{len(unassigned)} estação(ões) a mais de {max_distance_km} km "
+                f"de qualquer UF ficaram sem região: {', '.join(unassigned)}",
+                stacklevel=2,
+            )
+
+        return pd.Series(
+            regions.to_numpy(), index=points["ESTACAO"].to_numpy(), name="Região/UF"
+        )
+    except Exception as e:
+        raise RuntimeError(f"Erro ao associar estações às regiões: {e}")
+
+
+# Dimensões e estatísticas do cubo climático pré-agregado
+CUBE_KEYS = ["Ano", "Ano_Safra", "Estacao", "Janela_Plantio", "Região/UF"]
+CUBE_STATS = ["mean", "min", "max", "count"]
+
+
+def build_weather_cube(
+    weather_data: pd.DataFrame, station_to_region=None, keys=CUBE_KEYS
+) -> pd.DataFrame:
+    """
+    Constrói o cubo climático (Ano × Ano_Safra × Estacao × Janela_Plantio ×
+    Região/UF × variável).
+
+    O resultado é indexado pelas dimensões em ``keys`` (por padrão
+    ``CUBE_KEYS``) e tem colunas em dois níveis (variável, estatística) com
+    média, mínimo, máximo e contagem. Estações sem região conhecida são mantidas
+    com Região/UF nula, para que consultas que não usam a região continuem
+    considerando todos os registros.
+    """
+    try:
+        if station_to_region is None:
+            station_to_region = STATION_TO_REGION
+
+        keys = list(keys)
+        if "Região/UF" in keys and "Região/UF" not in weather_data.columns:
+            weather_data = apply_compact_schema(
+                weather_data.assign(
+                    **{"Região/UF": weather_data["ESTACAO"].map(station_to_region)}
+                )
+            )
+
+        variables = [
+            col
+            for col in weather_data.select_dtypes(include="number").columns
+            if col not in CALENDAR_COLUMNS
+        ]
+
+        cube = weather_data.groupby(keys, observed=True, dropna=False)[
+            variables
+        ].agg(CUBE_STATS)
+
+        return cube.sort_index()
+    except Exception as e:
+        raise RuntimeError(f"Erro ao construir cubo climático: {e}")
+
+
+def combine_weather_cubes(cubes) -> pd.DataFrame:
+    """
+    Combina cubos climáticos parciais com as mesmas dimensões em um único cubo.
+
+    Células repetidas são unidas somando as contagens, ponderando as médias pela
+    contagem e tomando o menor mínimo e o maior máximo, de modo que o resultado
+    equivale a construir o cubo a partir de todos os registros de uma vez.
+    """
+    cube = pd.concat(list(cubes))
+    levels = list(cube.index.names)
+
+    def grouped(stat):
+        return cube.xs(stat, axis=1, level=1).groupby(
+            level=levels, observed=True, dropna=False
+        )
+
+    counts = cube.xs("count", axis=1, level=1)
+    totals = (cube.xs("mean", axis=1, level=1) * counts).groupby(
+        level=levels, observed=True, dropna=False
+    )
+    total_counts = grouped("count").sum()
+
+    combined = pd.concat(
+        {
+            "mean": totals.sum() / total_counts.where(total_counts > 0),
+            "min": grouped("min").min(),
+            "max": grouped("max").max(),
+            "count": total_counts,
+        },
+        axis=1,
+    ).swaplevel(axis=1)
+
+    return combined.reindex(columns=cube.columns).sort_index()
+
+
+def rollup_weather_cube(station_cube: pd.DataFrame, station_to_region=None):
+    """
+    Converte um cubo por estação (Ano × Estacao × ESTACAO) no cubo por região.
+
+    Permite manter o pré-agregado por estação e reagregá-lo sempre que o
+    mapeamento estação -> UF mudar, sem reler os dados diários.
+    """
+    try:
+        if station_to_region is None:
+            station_to_region = STATION_TO_REGION
+
+        index = station_cube.index.to_frame(index=False)
+        index["Região/UF"] = index["ESTACAO"].astype(str).map(station_to_region)
+        cube = station_cube.set_axis(
+            pd.MultiIndex.from_frame(index[CUBE_KEYS]), axis=0
+        )
+
+        return combine_weather_cubes([cube])
+    except Exception as e:
+        raise RuntimeError(f"Erro ao reagregar cubo climático: {e}")
+
+
+def query_weather_cube(
+    cube: pd.DataFrame,
+    by=("Ano", "Estacao"),
+    variables=None,
+    stat="mean",
+    years=None,
+    seasons=None,
+    regions=None,
+    windows=None,
+) -> pd.DataFrame:
+    """
+    Consulta o cubo climático, reagregando para as dimensões em ``by``.
+
+    As médias são combinadas ponderando pela contagem de cada célula, de modo que
+    o resultado equivale a ``groupby(by).mean()`` sobre os dados diários. Grupos
+    com Região/UF nula são descartados quando a região faz parte de ``by``.
+
+    Returns:
+        pd.DataFrame: Colunas ``by`` seguidas de uma coluna por variável.
+    """
+    by = list(by)
+    if variables is None:
+        variables = list(cube.columns.get_level_values(0).unique())
+
+    # Filtrar células pelos níveis do índice
+    mask = np.ones(len(cube), dtype=bool)
+    filters = (
+        ("Ano", years),
+        ("Estacao", seasons),
+        ("Região/UF", regions),
+        ("Janela_Plantio", windows),
+    )
+    for level, values in filters:
+        if values is not None:
+            mask &= cube.index.get_level_values(level).isin(list(values))
+    cube = cube[mask]
+
+    counts = cube.xs("count", axis=1, level=1)[variables]
+    grouped_counts = counts.groupby(level=by, observed=True)
+
+    if stat == "mean":
+        means = cube.xs("mean", axis=1, level=1)[variables]
+        totals = (means * counts).groupby(level=by, observed=True).sum()
+        result = totals / grouped_counts.sum()
+    elif stat == "min":
+        result = (
+            cube.xs("min", axis=1, level=1)[variables]
+            .groupby(level=by, observed=True)
+            .min()
+        )
+    elif stat == "max":
+        result = (
+            cube.xs("max", axis=1, level=1)[variables]
+            .groupby(level=by, observed=True)
+            .max()
+        )
+    elif stat == "count":
+        result = grouped_counts.sum()
+    else:
+        raise ValueError(f"Estatística não suportada: {stat}")
+
+    return apply_compact_schema(result.reset_index())
+
+
+def crop_calendar_weather(cube: pd.DataFrame, by=("Região/UF",), **filters):
+    """
+    Médias climáticas por ano-safra e janela de plantio (safra e safrinha).
+
+    A coluna Ano do resultado é o Ano_Safra dos registros (ano inicial, como
+    "2023/24" -> 2023), alinhado ao Ano dos dados da CONAB: a safra de out–dez
+    pertence ao próprio ano e a safrinha de jan–fev, ao ano-safra anterior.
+    """
+    result = query_weather_cube(
+        cube,
+        by=["Ano_Safra", "Janela_Plantio", *by],
+        windows=["Safra", "Safrinha"],
+        **filters,
+    ).rename(columns={"Ano_Safra": "Ano"})
+    result["Janela_Plantio"] = result["Janela_Plantio"].cat.remove_unused_categories()
+
+    return result
+
+
+# Chaves de alinhamento entre dados de algodão e climáticos
+JOIN_KEYS = ["Ano", "Região/UF", "Estacao"]
+
+# Limite de linhas de uma junção antes de materializá-la e tamanho a partir do
+# qual a junção é feita, mas com um aviso
+MAX_JOIN_ROWS = 5_000_000
+WARN_JOIN_ROWS = 1_000_000
+
+
+def estimate_join_rows(left: pd.DataFrame, right: pd.DataFrame, on, how="inner"):
+    """
+    Estima o número de linhas de uma junção a partir das contagens por chave.
+
+    Returns:
+        tuple: (linhas resultantes, maior repetição de chave à esquerda,
+        maior repetição de chave à direita).
+    """
+    on = list(on)
+    counts = pd.concat(
+        [
+            left.groupby(on, observed=True, dropna=False).size().rename("left"),
+            right.groupby(on, observed=True, dropna=False).size().rename("right"),
+        ],
+        axis=1,
+    ).fillna(0)
+    n_left, n_right = counts["left"].to_numpy(), counts["right"].to_numpy()
+
+    if how == "inner":
+        rows = n_left * n_right
+    elif how == "left":
+        rows = n_left * np.maximum(n_right, 1) * (n_left > 0)
+    elif how == "right":
+        rows = n_right * np.maximum(n_left, 1) * (n_right > 0)
+    elif how == "outer":
+        rows = np.maximum(n_left, 1) * np.maximum(n_right, 1)
+    else:
+        raise ValueError(f"Tipo de junção não suportado: {how}")
+
+    return int(rows.sum()), int(n_left.max(initial=0)), int(n_right.max(initial=0))
+
+
+def keyed_merge(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    on=None,
+    how="inner",
+    validate=None,
+    max_rows=MAX_JOIN_ROWS,
+    warn_rows=WARN_JOIN_ROWS,
+) -> pd.DataFrame:
+    """
+    Junta dois DataFrames pelas chaves em comum, validando a cardinalidade.
+
+    Sem ``on`` explícito, usa as colunas de ``JOIN_KEYS`` presentes nos dois
+    lados. A cardinalidade (``one_to_one``, ``one_to_many``, ``many_to_one``) e o
+    número de linhas resultantes são verificados antes da junção, de modo que
+    uma chave incompleta não gere silenciosamente milhões de linhas: acima de
+    ``warn_rows`` é emitido um aviso (``warnings.warn``) e, acima de
+    ``max_rows``, a junção é recusada. A estimativa fica em
+    ``attrs["estimated_rows"]`` do resultado. Os tipos compactos das chaves
+    (categorias de Região/UF e Estacao, Ano int16) são restaurados no resultado.
+    """
+    if on is None:
+        on = [key for key in JOIN_KEYS if key in left.columns and key in right.columns]
+    on = [on] if isinstance(on, str) else list(on)
+    if not on:
+        raise ValueError("Nenhuma chave de junção em comum entre os dados.")
+
+    rows, left_max, right_max = estimate_join_rows(left, right, on, how)
+
+    if validate in ("one_to_one", "one_to_many") and left_max > 1:
+        raise ValueError(
+            f"Junção em {on} não é {validate}: chaves duplicadas à esquerda."
+        )
+    if validate in ("one_to_one", "many_to_one") and right_max > 1:
+        raise ValueError(
+            f"Junção em {on} não é {validate}: chaves duplicadas à direita."
+        )
+    if max_rows is not None and rows > max_rows:
+        raise ValueError(
+            f"Junção em {on} geraria {rows} linhas (limite de {max_rows})."
+        )
+    if warn_rows is not None and rows > warn_rows:
+        warnings.warn(
+            f"Junção em {on} vai gerar {rows} linhas (aviso acima de {warn_rows}).",
+            stacklevel=2,
+        )
+
+    result = apply_compact_schema(pd.merge(left, right, on=on, how=how))
+    result.attrs["estimated_rows"] = rows
+    return result
+
+
+def weather_means(weather_data: pd.DataFrame, keys) -> pd.DataFrame:
+    """
+    Calcula as médias das variáveis climáticas na granularidade de ``keys``.
+    """
+    keys = list(keys)
+    value_cols = [
+        col
+        for col in weather_data.select_dtypes(include="number").columns
+        if col not in keys and col not in CALENDAR_COLUMNS
+    ]
+    means = weather_data.groupby(keys, as_index=False, observed=True)[
+        value_cols
+    ].mean()
+    return apply_compact_schema(means)
 
 
 def analyze_seasonal_trends(
-    cotton_data: pd.DataFrame, weather_data: pd.DataFrame
+    cotton_data: pd.DataFrame, weather_data: pd.DataFrame, season_col="Estacao"
 ) -> pd.DataFrame:
     """
     Analisa tendências sazonais combinando dados de algodão e climáticos.
+
+    ``season_col`` escolhe o recorte do ano: "Estacao" (estações do ano) ou
+    "Janela_Plantio" (safra/safrinha, com clima de ``crop_calendar_weather``).
     """
     try:
-        # Identificar colunas numéricas
-        numeric_cols = weather_data.select_dtypes(include=[float, int]).columns.tolist()
+        # Agrupar os dados climáticos por ano, estação e, se disponível, região
+        keys = [
+            key
+            for key in ("Ano", "Região/UF", season_col)
+            if key in weather_data.columns
+        ]
+        seasonal_weather = weather_means(weather_data, keys)
 
-        # Agrupar os dados climáticos por ano e estação, calculando a média
-        seasonal_weather = weather_data.groupby(["Ano", "Estacao"], as_index=False)[
-            numeric_cols
-        ].mean()
-
-        # Combinar dados de algodão com as tendências sazonais climáticas
-        combined_data = pd.merge(cotton_data, seasonal_weather, on="Ano", how="inner")
+        # Alinhar cada UF com o clima da própria região em cada estação; sem a
+        # região, as médias sazonais nacionais são replicadas para cada UF
+        on = [key for key in keys if key in cotton_data.columns]
+        validate = "one_to_many" if "Região/UF" in on else "many_to_many"
+        combined_data = keyed_merge(
+            cotton_data, seasonal_weather, on=on, validate=validate
+        )
 
         #print("Pré-visualização dos dados sazonais combinados:")
         #print(combined_data.head())
@@ -68,58 +468,152 @@ def analyze_regional_potential(cotton_data, weather_data):
         raise RuntimeError(f"Erro ao analisar potencial regional: {e}")
 
 
-def analyze_climatic_influences(cotton_data, weather_data):
+# Métodos do serviço de correlação compartilhado pelas abas de influência
+# climática e de mapa de calor
+CORRELATION_METHODS = ["pearson", "spearman"]
+
+
+def correlation_statistics(data: pd.DataFrame, columns, shift) -> dict:
+    """
+    Estatísticas suficientes de um bloco para a correlação de Pearson par a par.
+
+    Os valores são centralizados por ``shift`` e multiplicados em float32; as
+    contagens, somas, somas de quadrados e produtos cruzados de cada par de
+    colunas consideram apenas as linhas em que as duas estão preenchidas.
+    """
+    values = data[list(columns)].to_numpy(dtype=np.float32) - shift
+    present = ~np.isnan(values)
+    filled = np.where(present, values, np.float32(0))
+    weights = present.astype(np.float32)
+
+    return {
+        "n": (weights.T @ weights).astype(np.float64),
+        "sum": (filled.T @ weights).astype(np.float64),
+        "sumsq": ((filled * filled).T @ weights).astype(np.float64),
+        "cross": (filled.T @ filled).astype(np.float64),
+    }
+
+
+def pearson_from_statistics(stats: dict, columns) -> pd.DataFrame:
+    """
+    Converte estatísticas acumuladas na matriz de correlação de Pearson.
+    """
+    n, sums, sumsq = stats["n"], stats["sum"], stats["sumsq"]
+    cov = n * stats["cross"] - sums * sums.T
+    var = n * sumsq - sums**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var * var.T)
+    corr = np.clip(corr, -1.0, 1.0)
+
+    # Como em DataFrame.corr: diagonal 1 para colunas não constantes
+    diagonal = np.diag_indices_from(corr)
+    corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+
+    return pd.DataFrame(corr, index=list(columns), columns=list(columns))
+
+
+def correlation_matrix(
+    cotton_data: pd.DataFrame,
+    weather_data: pd.DataFrame,
+    on=("Ano", "Região/UF"),
+    method="pearson",
+    lag=0,
+    chunksize=1_000_000,
+) -> pd.DataFrame:
+    """
+    Calcula a matriz de correlação das colunas numéricas da junção algodão × clima.
+
+    A junção é feita em blocos de ``chunksize`` linhas do clima e, para Pearson,
+    cada bloco é reduzido às estatísticas suficientes, de modo que a memória não
+    cresce com o número de linhas. Spearman precisa dos postos globais e usa a
+    junção completa (com valores ausentes, os postos são calculados por coluna e
+    não por par). Com ``lag`` = k, o clima do ano t é comparado à área do ano
+    t + k.
+    """
+    try:
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Método de correlação não suportado: {method}")
+
+        on = list(on)
+        if lag:
+            cotton_data = cotton_data.assign(Ano=cotton_data["Ano"] - lag)
+
+        blocks = (
+            keyed_merge(
+                cotton_data,
+                weather_data.iloc[start : start + chunksize],
+                on=on,
+                validate="one_to_many",
+            )
+            for start in range(0, max(len(weather_data), 1), chunksize)
+        )
+
+        if method == "spearman":
+            combined = pd.concat(blocks, ignore_index=True)
+            columns = list(combined.select_dtypes(include="number").columns)
+            ranks = combined[columns].rank()
+            stats = correlation_statistics(
+                ranks, columns, ranks.mean().fillna(0).to_numpy(np.float32)
+            )
+            return pearson_from_statistics(stats, columns)
+
+        stats, columns, shift = None, None, None
+        for block in blocks:
+            if columns is None:
+                columns = list(block.select_dtypes(include="number").columns)
+                shift = block[columns].mean().fillna(0).to_numpy(np.float32)
+            block_stats = correlation_statistics(block, columns, shift)
+            if stats is None:
+                stats = block_stats
+            else:
+                stats = {key: stats[key] + block_stats[key] for key in stats}
+
+        return pearson_from_statistics(stats, columns)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao calcular correlações: {e}")
+
+
+def analyze_climatic_influences(
+    cotton_data, weather_data, method="pearson", lag=0, corr_matrix=None
+):
     # Garantir que 'Região/UF' exista em ambos os datasets
     if "Região/UF" not in weather_data.columns:
-        # Exemplo de mapeamento; ajuste conforme necessário
-        station_to_region = {
-            "A001": "NORTE",
-            "A002": "NORDESTE",
-            # Outros mapeamentos
-        }
-        weather_data["Região/UF"] = weather_data["ESTACAO"].map(station_to_region)
+        weather_data["Região/UF"] = weather_data["ESTACAO"].map(STATION_TO_REGION)
 
     # Certificar-se de que a coluna 'Ano' existe e está correta
     if "Ano" not in weather_data.columns:
         weather_data["Ano"] = pd.to_datetime(weather_data["DATA (YYYY-MM-DD)"]).dt.year
 
-    # Realizar a mesclagem
-    combined_data = cotton_data.merge(
-        weather_data, on=["Ano", "Região/UF"], how="inner"
-    )
-
-    # Filtrar apenas colunas numéricas
-    numeric_data = combined_data.select_dtypes(include=["float64", "int64"])
+    # Reaproveitar a matriz já calculada pelo serviço de correlação, se houver
+    if corr_matrix is None:
+        corr_matrix = correlation_matrix(
+            cotton_data, weather_data, method=method, lag=lag
+        )
 
     # Calcular correlações
-    correlations = numeric_data.corr()["Area_Plantada"].sort_values(ascending=False)
+    correlations = corr_matrix["Area_Plantada"].sort_values(ascending=False)
 
     return correlations
 
 
 def analyze_historical_trends(cotton_data):
+    """
+    Soma a área plantada por ano. Os gráficos ficam em ``visualization``.
+    """
     # Garantir que o nome da coluna esteja correto
     if "Area_Planted" not in cotton_data.columns:
-        cotton_data.rename(columns={"Area_Plantada": "Area_Planted"}, inplace=True)
+        cotton_data = cotton_data.rename(columns={"Area_Plantada": "Area_Planted"})
 
     # Agrupar por ano e somar a área plantada
     historical_trends = cotton_data.groupby("Ano")["Area_Planted"].sum().reset_index()
 
-    # Criar visualização
-    plt.figure(figsize=(10, 6))
-    plt.plot(historical_trends["Ano"], historical_trends["Area_Planted"], marker="o")
-    plt.title("Tendências Históricas de Plantio de Algodão")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (em mil hectares)")
-    plt.grid(True)
-    plt.tight_layout()
-    st.pyplot(plt)
-    plt.close()
-
     return historical_trends
 
 
 def predict_planted_area(cotton_data, years_to_consider=10, forecast_until=2030):
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import PolynomialFeatures
+
     try:
         cotton_data = cotton_data.rename(columns={"Area_Plantada": "Area_Planted"})
         recent_years = sorted(cotton_data["Ano"].unique())[-years_to_consider:]
@@ -129,7 +623,12 @@ def predict_planted_area(cotton_data, years_to_consider=10, forecast_until=2030)
         if filtered_data.empty or filtered_data["Area_Planted"].isnull().all():
             raise ValueError("Dados insuficientes para previsão.")
 
-        X = filtered_data["Ano"].values.reshape(-1, 1)
+        # Anos em float e centralizados no último ano: com o Ano int16 as
+        # potências transbordariam e, sem centralizar, o ajuste fica mal
+        # condicionado
+        years = filtered_data["Ano"].to_numpy(dtype=np.float64)
+        origin = years.max()
+        X = (years - origin).reshape(-1, 1)
         y = filtered_data["Area_Planted"].values
 
         # Regressão polinomial
@@ -139,8 +638,8 @@ def predict_planted_area(cotton_data, years_to_consider=10, forecast_until=2030)
         model.fit(X_poly, y)
 
         # Prever anos futuros
-        future_years = np.arange(X[-1][0] + 1, forecast_until + 1).reshape(-1, 1)
-        future_predictions = model.predict(poly.transform(future_years))
+        future_years = np.arange(int(origin) + 1, forecast_until + 1).reshape(-1, 1)
+        future_predictions = model.predict(poly.transform(future_years - origin))
 
         # Criar DataFrame de previsões
         predictions = pd.DataFrame(
@@ -155,6 +654,272 @@ def predict_planted_area(cotton_data, years_to_consider=10, forecast_until=2030)
         raise RuntimeError(f"Erro ao prever área plantada: {e}")
 
 
+def fit_polynomial_batch(x, values, degree=2) -> np.ndarray:
+    """
+    Ajusta um polinômio de grau ``degree`` a cada linha de ``values`` de uma vez.
+
+    ``x`` (T) são as abscissas comuns e ``values`` (S × T) as séries; valores
+    ausentes recebem peso zero. As equações normais de todas as séries formam um
+    array S × p × p resolvido em uma única chamada, com custo praticamente igual
+    ao de uma série. Séries com até ``degree`` pontos recebem coeficientes NaN.
+
+    Returns:
+        np.ndarray: Coeficientes S × (degree + 1), em potências crescentes de x.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+    weights = (~np.isnan(values)).astype(np.float64)
+    filled = np.where(weights > 0, values, 0.0)
+    design = np.vander(x, degree + 1, increasing=True)
+
+    gram = np.einsum("st,tk,tl->skl", weights, design, design)
+    moments = filled @ design
+
+    coefs = np.full((len(values), degree + 1), np.nan)
+    valid = weights.sum(axis=1) > degree
+    if valid.any():
+        coefs[valid] = np.linalg.solve(gram[valid], moments[valid][..., None])[..., 0]
+
+    return coefs
+
+
+def predict_planted_area_by_region(
+    cotton_data, years_to_consider=10, forecast_until=2030, degree=2
+) -> pd.DataFrame:
+    """
+    Prevê a área plantada de todas as Regiões/UF em uma única chamada.
+
+    Usa a mesma regressão polinomial de ``predict_planted_area`` sobre os
+    ``years_to_consider`` anos mais recentes, mas ajusta todas as séries juntas
+    com ``fit_polynomial_batch`` (anos centralizados no último ano observado).
+
+    Returns:
+        pd.DataFrame: Região/UF, Ano e Area_Planted_Predicted.
+    """
+    try:
+        value_col = "Area_Planted" if "Area_Planted" in cotton_data else "Area_Plantada"
+        series = (
+            cotton_data.groupby(["Região/UF", "Ano"], observed=True)[value_col]
+            .sum(min_count=1)
+            .unstack("Ano")
+            .sort_index(axis=1)
+        )
+        years = series.columns.to_numpy()[-years_to_consider:]
+        if len(years) <= degree:
+            raise ValueError("Dados insuficientes para previsão.")
+
+        origin = years[-1]
+        coefs = fit_polynomial_batch(
+            years - origin, series[years].to_numpy(), degree
+        )
+
+        # Prever anos futuros para todas as séries
+        future_years = np.arange(origin + 1, forecast_until + 1)
+        design = np.vander(future_years - origin, degree + 1, increasing=True)
+        predictions = coefs @ design.T
+
+        forecasts = pd.DataFrame(
+            {
+                "Região/UF": np.repeat(series.index.to_numpy(), len(future_years)),
+                "Ano": np.tile(future_years, len(series)),
+                "Area_Planted_Predicted": predictions.ravel(),
+            }
+        )
+        forecasts = forecasts.dropna(subset=["Area_Planted_Predicted"])
+
+        return apply_compact_schema(forecasts.reset_index(drop=True))
+    except Exception as e:
+        raise RuntimeError(f"Erro ao prever área plantada por região: {e}")
+
+
+# Grade padrão do backtesting: janelas (anos de treino) e graus do polinômio
+BACKTEST_WINDOWS = range(2, 49)
+BACKTEST_DEGREES = (1, 2, 3)
+
+
+def _area_series(cotton_data) -> pd.DataFrame:
+    """
+    Séries de área plantada (Região/UF × Ano) em uma grade anual contínua.
+
+    Sem a coluna Região/UF (ex.: a série nacional), devolve uma única série
+    "BRASIL".
+    """
+    value_col = "Area_Planted" if "Area_Planted" in cotton_data else "Area_Plantada"
+    if "Região/UF" not in cotton_data.columns:
+        cotton_data = cotton_data.assign(**{"Região/UF": "BRASIL"})
+
+    series = (
+        cotton_data.groupby(["Região/UF", "Ano"], observed=True)[value_col]
+        .sum(min_count=1)
+        .unstack("Ano")
+    )
+    years = np.arange(series.columns.min(), series.columns.max() + 1)
+    return series.reindex(columns=years)
+
+
+def _window_moments(x, values, max_degree):
+    """
+    Somas acumuladas (no tempo) dos momentos usados nas equações normais.
+
+    Returns:
+        tuple: (pesos × x^k, k = 0..2·grau; pesos × y × x^k, k = 0..grau), cada
+        um com formato S × (T + 1) × K e zeros na primeira posição.
+    """
+    weights = (~np.isnan(values)).astype(np.float64)
+    filled = np.where(weights > 0, values, 0.0)
+    powers = x[None, :, None] ** np.arange(2 * max_degree + 1)
+
+    def prefix(terms):
+        zeros = np.zeros((terms.shape[0], 1, terms.shape[2]))
+        return np.concatenate([zeros, np.cumsum(terms, axis=1)], axis=1)
+
+    return (
+        prefix(weights[..., None] * powers),
+        prefix(filled[..., None] * powers[..., : max_degree + 1]),
+    )
+
+
+def _backtest_window(
+    x, values, gram_prefix, moment_prefix, window, degrees, horizons
+):
+    """
+    Avalia todas as origens de uma janela, para cada grau e horizonte.
+
+    As equações normais de cada origem saem da diferença de duas somas
+    acumuladas: avançar a origem soma o ano novo e retira o mais antigo (mínimos
+    quadrados incrementais), sem reajustar a partir dos dados. O ajuste de cada
+    dobra é feito uma vez e reaproveitado por todos os horizontes.
+
+    Returns:
+        list: Tuplas (grau, horizonte, soma dos erros absolutos, nº de erros,
+        soma dos erros percentuais, nº de erros percentuais), cada soma por série.
+    """
+    n_years = values.shape[1]
+    n_origins = n_years - window
+    if n_origins <= 0:
+        return []
+
+    # Momentos das janelas [o - window + 1, o], para o = window - 1 .. T - 2
+    gram_moments = gram_prefix[:, window:n_years] - gram_prefix[:, : n_years - window]
+    target_moments = (
+        moment_prefix[:, window:n_years] - moment_prefix[:, : n_years - window]
+    )
+    counts = gram_moments[..., 0]
+
+    results = []
+    for degree in degrees:
+        size = degree + 1
+        hankel = np.add.outer(np.arange(size), np.arange(size))
+        gram = gram_moments[..., hankel]
+        valid = counts > degree
+
+        coefs = np.full(gram.shape[:-1], np.nan)
+        if valid.any():
+            coefs[valid] = np.linalg.solve(
+                gram[valid], target_moments[..., :size][valid][..., None]
+            )[..., 0]
+
+        for horizon in range(1, horizons + 1):
+            n_folds = n_origins - horizon + 1
+            if n_folds <= 0:
+                break
+            targets = np.arange(window - 1, window - 1 + n_folds) + horizon
+            design = x[targets, None] ** np.arange(size)
+            predictions = np.einsum("sok,ok->so", coefs[:, :n_folds], design)
+            actual = values[:, targets]
+
+            errors = np.abs(predictions - actual)
+            observed = ~np.isnan(errors)
+            relative = observed & (actual != 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                percent = np.where(relative, errors / np.abs(actual), 0.0)
+
+            results.append(
+                (
+                    degree,
+                    horizon,
+                    np.where(observed, errors, 0.0).sum(axis=1),
+                    observed.sum(axis=1),
+                    percent.sum(axis=1),
+                    relative.sum(axis=1),
+                )
+            )
+
+    return results
+
+
+def backtest_planted_area(
+    cotton_data,
+    windows=BACKTEST_WINDOWS,
+    degrees=BACKTEST_DEGREES,
+    horizons=5,
+    by_region=False,
+    n_jobs=None,
+) -> pd.DataFrame:
+    """
+    Backtesting por origem móvel da previsão polinomial de área plantada.
+
+    Para cada janela (anos de treino), grau e origem, ajusta o polinômio nos
+    ``window`` anos até a origem e prevê os ``horizons`` anos seguintes, em
+    todas as Regiões/UF de uma vez. As janelas são avaliadas em paralelo num
+    pool de processos (``n_jobs=1`` executa no processo atual).
+
+    Returns:
+        pd.DataFrame: Janela, Grau, Horizonte, MAE, MAPE (%) e Dobras (nº de
+        previsões avaliadas); com ``by_region``, uma linha por Região/UF.
+    """
+    try:
+        series = _area_series(cotton_data)
+        values = series.to_numpy(dtype=np.float64)
+        n_years = values.shape[1]
+
+        # Anos reescalados para [-0,5; 0,5], o que mantém as equações normais
+        # bem condicionadas até o grau 3
+        x = (np.arange(n_years) - (n_years - 1) / 2) / max(n_years - 1, 1)
+        degrees = sorted(degrees)
+        gram_prefix, moment_prefix = _window_moments(x, values, degrees[-1])
+
+        windows = [window for window in windows if window < n_years]
+        tasks = [
+            (x, values, gram_prefix, moment_prefix, window, degrees, horizons)
+            for window in windows
+        ]
+        if n_jobs == 1 or len(tasks) <= 1:
+            outputs = [_backtest_window(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                outputs = list(executor.map(_backtest_window, *zip(*tasks)))
+
+        regions = series.index.to_numpy()
+        rows = []
+        for window, results in zip(windows, outputs):
+            for degree, horizon, abs_sum, n, pct_sum, n_pct in results:
+                if not by_region:
+                    abs_sum, n, pct_sum, n_pct = (
+                        totals.sum(keepdims=True)
+                        for totals in (abs_sum, n, pct_sum, n_pct)
+                    )
+                for i in range(len(n)):
+                    if n[i] == 0:
+                        continue
+                    row = {
+                        "Janela": window,
+                        "Grau": degree,
+                        "Horizonte": horizon,
+                        "MAE": abs_sum[i] / n[i],
+                        "MAPE": 100 * pct_sum[i] / n_pct[i] if n_pct[i] else np.nan,
+                        "Dobras": int(n[i]),
+                    }
+                    if by_region:
+                        row = {"Região/UF": regions[i], **row}
+                    rows.append(row)
+
+        return apply_compact_schema(pd.DataFrame(rows))
+    except Exception as e:
+        raise RuntimeError(f"Erro no backtesting da previsão: {e}")
+
+
 def preprocess_data(file_path: str) -> pd.DataFrame:
     """
     Pré-processa os dados de área plantada de algodão.
@@ -184,11 +949,87 @@ def preprocess_data(file_path: str) -> pd.DataFrame:
         # Remover valores ausentes
         data_long = data_long.dropna(subset=["Ano", "Area_Plantada"])
 
-        return data_long
+        return apply_compact_schema(data_long)
     except Exception as e:
         raise RuntimeError(f"Erro ao pré-processar dados: {e}")
 
-def monte_carlo_simulation(data, num_simulations=1000, forecast_years=10):
+# Modelos disponíveis para as simulações de Monte Carlo
+MONTE_CARLO_MODELS = ["iid", "random_walk", "ar1"]
+
+
+def simulate_area_paths(
+    data,
+    num_simulations=1000,
+    forecast_years=10,
+    model="iid",
+    trend=False,
+    seed=None,
+    dtype=np.float64,
+):
+    """
+    Gera trajetórias de Monte Carlo da área plantada em uma única matriz.
+
+    Todos os choques (simulações × anos) são sorteados de uma vez com um
+    ``numpy.random.Generator``, o que torna o resultado reprodutível via ``seed``.
+
+    Args:
+        data (pd.DataFrame): Dados históricos com "Ano" e "Area_Planted".
+        num_simulations (int): Número de trajetórias.
+        forecast_years (int): Número de anos a serem previstos.
+        model (str): "iid" (ruído em torno da média), "random_walk" (passeio
+            aleatório a partir do último ano) ou "ar1" (autorregressivo de ordem 1).
+        trend (bool): Considera a tendência linear histórica (nível da média,
+            deriva do passeio ou centro do AR(1)).
+        seed (int): Semente do gerador aleatório.
+        dtype: Tipo dos valores gerados (float32 reduz a memória pela metade).
+
+    Returns:
+        tuple: (anos previstos, matriz ``num_simulations × forecast_years``).
+    """
+    if model not in MONTE_CARLO_MODELS:
+        raise ValueError(f"Modelo de Monte Carlo desconhecido: {model}")
+
+    history = data.sort_values("Ano")
+    years = history["Ano"].to_numpy(dtype=float)
+    values = history["Area_Planted"].to_numpy(dtype=float)
+    last_year = int(years[-1])
+    future_years = np.arange(last_year + 1, last_year + forecast_years + 1)
+
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((num_simulations, forecast_years), dtype=dtype)
+
+    # Nível de referência: média histórica ou tendência linear
+    if trend and len(values) > 1:
+        slope, intercept = np.polyfit(years, values, deg=1)
+        baseline = intercept + slope * future_years
+        residuals = values - (intercept + slope * years)
+    else:
+        baseline = np.full(forecast_years, values.mean())
+        residuals = values - values.mean()
+
+    if model == "iid":
+        paths = baseline + residuals.std() * shocks
+    elif model == "random_walk":
+        diffs = np.diff(values)
+        drift = diffs.mean() if trend else 0.0
+        paths = values[-1] + np.cumsum(drift + diffs.std() * shocks, axis=1)
+    else:
+        # AR(1) sobre os desvios em relação ao nível de referência
+        lagged, current = residuals[:-1], residuals[1:]
+        phi = np.clip(lagged @ current / (lagged @ lagged), -0.99, 0.99)
+        sigma = (current - phi * lagged).std()
+        deviation = np.full(num_simulations, residuals[-1], dtype=dtype)
+        paths = np.empty_like(shocks)
+        for h in range(forecast_years):
+            deviation = phi * deviation + sigma * shocks[:, h]
+            paths[:, h] = baseline[h] + deviation
+
+    return future_years, paths.astype(dtype, copy=False)
+
+
+def monte_carlo_simulation(
+    data, num_simulations=1000, forecast_years=10, model="iid", trend=False, seed=None
+):
     """
     Realiza simulações de Monte Carlo para prever a área plantada de algodão.
     
@@ -196,59 +1037,379 @@ def monte_carlo_simulation(data, num_simulations=1000, forecast_years=10):
         data (pd.DataFrame): Dados históricos de área plantada.
         num_simulations (int): Número de simulações a serem realizadas.
         forecast_years (int): Número de anos a serem previstos.
+        model (str): Modelo das trajetórias (ver ``simulate_area_paths``).
+        trend (bool): Considera a tendência linear histórica.
+        seed (int): Semente para reprodutibilidade.
     
     Returns:
         pd.DataFrame: Resultados das simulações.
     """
-    # Extrair os dados históricos
-    historical_data = data["Area_Planted"].values
-    last_year = data["Ano"].max()
-    
-    # Calcular a média e o desvio padrão dos dados históricos
-    mean = np.mean(historical_data)
-    std_dev = np.std(historical_data)
-    
-    # Realizar as simulações
-    simulations = []
-    for _ in range(num_simulations):
-        forecast = [mean + std_dev * np.random.randn() for _ in range(forecast_years)]
-        simulations.append(forecast)
-    
+    future_years, paths = simulate_area_paths(
+        data, num_simulations, forecast_years, model=model, trend=trend, seed=seed
+    )
+
     # Criar um DataFrame com os resultados
-    simulation_df = pd.DataFrame(simulations, columns=[f"Ano_{last_year + i + 1}" for i in range(forecast_years)])
+    simulation_df = pd.DataFrame(paths, columns=[f"Ano_{year}" for year in future_years])
     
     return simulation_df
 
+
+# Resolução dos histogramas usados para estimar percentis em modo streaming
+MONTE_CARLO_BINS = 4096
+
+
+def _shard_statistics(
+    data, num_paths, forecast_years, model, trend, seed, lower, width
+):
+    """
+    Simula um lote de trajetórias e o reduz a estatísticas combináveis.
+
+    Returns:
+        tuple: (contagem, média por ano, soma dos quadrados dos desvios por ano,
+        histograma por ano com bordas definidas por ``lower`` e ``width``).
+    """
+    _, paths = simulate_area_paths(
+        data,
+        num_paths,
+        forecast_years,
+        model=model,
+        trend=trend,
+        seed=seed,
+        dtype=np.float32,
+    )
+    mean = paths.mean(axis=0, dtype=np.float64)
+    m2 = ((paths - mean) ** 2).sum(axis=0)
+
+    # Histograma por ano em uma única passada (valores fora da faixa vão às bordas)
+    bins = MONTE_CARLO_BINS
+    positions = np.floor((paths - lower) / width).astype(np.int64)
+    np.clip(positions, 0, bins - 1, out=positions)
+    positions += np.arange(forecast_years) * bins
+    hist = np.bincount(positions.ravel(), minlength=forecast_years * bins)
+
+    return num_paths, mean, m2, hist.reshape(forecast_years, bins)
+
+
+def _merge_statistics(left, right):
+    """
+    Combina as estatísticas de dois lotes (média/variância pela fórmula de Chan).
+    """
+    n_a, mean_a, m2_a, hist_a = left
+    n_b, mean_b, m2_b, hist_b = right
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / n
+    return n, mean, m2, hist_a + hist_b
+
+
+def monte_carlo_streaming_percentiles(
+    data,
+    num_simulations=1_000_000,
+    forecast_years=10,
+    percentiles=(5, 50, 95),
+    model="iid",
+    trend=False,
+    seed=None,
+    n_jobs=None,
+    shard_size=250_000,
+):
+    """
+    Calcula faixas de percentis para milhões de trajetórias com memória constante.
+
+    As simulações são divididas em lotes independentes (sementes derivadas de
+    ``seed`` via ``SeedSequence.spawn``), executados em paralelo num pool de
+    processos. Cada lote devolve apenas contagem, média, variância e um
+    histograma por ano, que são combinados à medida que chegam; os percentis
+    são interpolados a partir do histograma final. O resultado depende apenas de
+    ``seed`` e ``shard_size``, não do número de processos.
+
+    Returns:
+        pd.DataFrame: Uma linha por ano previsto, com "Media", "DesvioPadrao" e
+        as colunas "P5", "P50", "P95" (conforme ``percentiles``).
+    """
+    n_shards = -(-num_simulations // shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_shards + 1)
+
+    # Execução piloto para fixar faixas comuns dos histogramas entre os lotes
+    future_years, pilot = simulate_area_paths(
+        data,
+        min(num_simulations, 20_000),
+        forecast_years,
+        model=model,
+        trend=trend,
+        seed=seeds[-1],
+        dtype=np.float32,
+    )
+    low, high = pilot.min(axis=0), pilot.max(axis=0)
+    margin = np.maximum(high - low, 1.0)
+    lower = (low - margin).astype(np.float64)
+    width = (high + margin - lower) / MONTE_CARLO_BINS
+
+    sizes = [
+        min(shard_size, num_simulations - i * shard_size) for i in range(n_shards)
+    ]
+    tasks = [
+        (data, size, forecast_years, model, trend, shard_seed, lower, width)
+        for size, shard_seed in zip(sizes, seeds[:-1])
+    ]
+
+    stats = None
+    if n_jobs == 1 or n_shards == 1:
+        for task in tasks:
+            shard = _shard_statistics(*task)
+            stats = shard if stats is None else _merge_statistics(stats, shard)
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for shard in executor.map(_shard_statistics, *zip(*tasks)):
+                stats = shard if stats is None else _merge_statistics(stats, shard)
+
+    n, mean, m2, hist = stats
+    result = pd.DataFrame(
+        {"Ano": future_years, "Media": mean, "DesvioPadrao": np.sqrt(m2 / n)}
+    )
+
+    # Percentis por interpolação linear dentro da classe do histograma
+    cumulative = hist.cumsum(axis=1)
+    for q in percentiles:
+        target = q / 100 * n
+        values = np.empty(forecast_years)
+        for h in range(forecast_years):
+            k = min(np.searchsorted(cumulative[h], target), MONTE_CARLO_BINS - 1)
+            before = cumulative[h, k - 1] if k > 0 else 0
+            fraction = (target - before) / max(hist[h, k], 1)
+            values[h] = lower[h] + (k + fraction) * width[h]
+        result[f"P{q:g}"] = values
+
+    return result
+
+
 #v2
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
+# scikit-learn e joblib são importados dentro das funções do modelo avançado,
+# para não pesarem na inicialização do app
+
+# Diretório do registro de modelos treinados
+MODEL_REGISTRY_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "models"
+)
+
+# Modelos já carregados neste processo, por assinatura
+_MODEL_CACHE = {}
+
+
+def training_fingerprint(
+    features: pd.DataFrame, target: pd.Series, test_rows: pd.Series, params: dict
+) -> str:
+    """
+    Gera a assinatura de um treino (dados, divisão treino/teste, hiperparâmetros
+    e versão do sklearn).
+    """
+    import sklearn
+
+    digest = hashlib.sha1()
+    rows = pd.util.hash_pandas_object(
+        pd.concat([features, target, test_rows.rename("_teste")], axis=1),
+        index=False,
+    )
+    digest.update(rows.to_numpy().tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(sklearn.__version__.encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def load_registered_model(fingerprint: str, registry_dir: str = MODEL_REGISTRY_DIR):
+    """
+    Retorna o modelo registrado (com métricas) ou None se não houver.
+    """
+    import joblib
+
+    if fingerprint in _MODEL_CACHE:
+        return _MODEL_CACHE[fingerprint]
+
+    path = os.path.join(registry_dir, f"{fingerprint}.joblib")
+    if not os.path.exists(path):
+        return None
+    try:
+        entry = joblib.load(path)
+    except Exception:
+        # Arquivo corrompido ou de versão incompatível: treina novamente
+        return None
+
+    _MODEL_CACHE[fingerprint] = entry
+    return entry
+
 
-def advanced_prediction(cotton_data, weather_data):
+def register_model(
+    fingerprint: str, entry: dict, registry_dir: str = MODEL_REGISTRY_DIR
+):
+    """
+    Persiste o modelo treinado e suas métricas no registro.
+    """
+    import joblib
+
+    _MODEL_CACHE[fingerprint] = entry
+    try:
+        os.makedirs(registry_dir, exist_ok=True)
+        path = os.path.join(registry_dir, f"{fingerprint}.joblib")
+        tmp_path = f"{path}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        # Diretório somente leitura: mantém apenas o cache em memória
+        pass
+
+
+# Backends disponíveis para o modelo avançado
+ADVANCED_BACKENDS = ["random_forest", "hist_gradient_boosting"]
+
+
+def build_regressor(backend="random_forest", n_estimators=100, n_jobs=-1):
+    """
+    Cria o regressor do modelo avançado para o backend escolhido.
+
+    ``random_forest`` treina as árvores em paralelo (``n_jobs``); o backend
+    ``hist_gradient_boosting`` usa histogramas e é mais rápido em tabelas grandes
+    (``n_estimators`` vira o número de iterações).
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+    if backend == "random_forest":
+        return RandomForestRegressor(
+            n_estimators=n_estimators, random_state=42, n_jobs=n_jobs
+        )
+    if backend == "hist_gradient_boosting":
+        return HistGradientBoostingRegressor(max_iter=n_estimators, random_state=42)
+    raise ValueError(f"Backend desconhecido: {backend}")
+
+
+def _latest_model_path(params: dict, registry_dir: str) -> str:
+    """
+    Caminho do ponteiro para o último modelo treinado com os mesmos hiperparâmetros.
+    """
+    key = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return os.path.join(registry_dir, f"latest-{key.hexdigest()[:20]}.txt")
+
+
+# Validação por ano: as safras com Ano múltiplo deste passo formam o conjunto de
+# teste, que não muda quando novas safras chegam (nem entre treinos incrementais)
+HOLDOUT_YEAR_STEP = 5
+
+
+def _holdout_mask(years: pd.Series) -> pd.Series:
+    """
+    Marca as linhas do conjunto de teste fixo (por ano).
+    """
+    return years.astype("int64") % HOLDOUT_YEAR_STEP == 0
+
+
+def advanced_prediction(
+    cotton_data,
+    weather_data,
+    registry_dir=MODEL_REGISTRY_DIR,
+    backend="random_forest",
+    n_estimators=100,
+    n_jobs=-1,
+    incremental=False,
+    warm_start_trees=25,
+    max_estimators=300,
+):
     """
     Realiza previsões usando um modelo de Random Forest.
+
+    O modelo treinado é guardado no registro (``registry_dir``) junto com MAE e
+    R²; enquanto os dados e hiperparâmetros não mudarem, ele é reaproveitado.
+    Com ``incremental=True`` e o backend ``random_forest``, dados novos (ex.: uma
+    nova safra) acrescentam ``warm_start_trees`` árvores ao último modelo com os
+    mesmos hiperparâmetros, em vez de treinar todas as árvores novamente; ao
+    passar de ``max_estimators`` árvores, o modelo é treinado do zero.
     """
+    from sklearn.metrics import mean_absolute_error, r2_score
+
     try:
         # Combinar os dados
-        combined_data = pd.merge(cotton_data, weather_data, on=["Ano", "Região/UF"], how="inner")
+        combined_data = keyed_merge(cotton_data, weather_data, on=["Ano", "Região/UF"], validate="one_to_many")
         
         # Selecionar features e target
-        features = combined_data[["temp_avg", "rain_max", "hum_max", "wind_avg"]]
+        feature_cols = ["temp_avg", "rain_max", "hum_max", "wind_avg"]
+        features = combined_data[feature_cols]
         target = combined_data["Area_Planted"]
-        
-        # Dividir os dados em treino e teste
-        X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
-        
-        # Treinar o modelo
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
-        
-        # Fazer previsões
-        y_pred = model.predict(X_test)
-        
-        # Calcular métricas de avaliação
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+
+        # Divisão treino/teste fixa por ano; entra na assinatura do treino
+        test_rows = _holdout_mask(combined_data["Ano"])
+
+        base_params = {
+            "model": backend,
+            "n_estimators": n_estimators,
+            "random_state": 42,
+            "holdout_year_step": HOLDOUT_YEAR_STEP,
+            "features": feature_cols,
+        }
+        data_fingerprint = training_fingerprint(
+            features, target, test_rows, base_params
+        )
+        latest_path = _latest_model_path(base_params, registry_dir)
+
+        # Modelo anterior do qual o treino incremental parte (se houver)
+        entry, parent, previous = None, None, None
+        can_warm_start = incremental and backend == "random_forest"
+        if can_warm_start and os.path.exists(latest_path):
+            with open(latest_path, encoding="utf-8") as f:
+                parent = f.read().strip()
+            previous = load_registered_model(parent, registry_dir)
+            if previous is None:
+                parent = None
+            elif previous.get("data_fingerprint") == data_fingerprint:
+                # Mesmos dados do último treino: nada a acrescentar
+                entry = previous
+            elif previous["model"].n_estimators + warm_start_trees > max_estimators:
+                parent, previous = None, None
+
+        params = {**base_params, "incremental": incremental, "parent": parent}
+        fingerprint = training_fingerprint(features, target, test_rows, params)
+        if entry is None:
+            entry = load_registered_model(fingerprint, registry_dir)
+
+        if entry is None:
+            # Dividir os dados em treino e teste
+            if test_rows.all() or not test_rows.any():
+                raise ValueError(
+                    "anos insuficientes para separar treino e teste "
+                    f"(teste: anos múltiplos de {HOLDOUT_YEAR_STEP})"
+                )
+            X_train, y_train = features[~test_rows], target[~test_rows]
+            X_test, y_test = features[test_rows], target[test_rows]
+
+            # Treinar o modelo
+            if previous is not None:
+                model = copy.deepcopy(previous["model"])
+                model.set_params(
+                    warm_start=True,
+                    n_estimators=model.n_estimators + warm_start_trees,
+                    n_jobs=n_jobs,
+                )
+            else:
+                model = build_regressor(backend, n_estimators, n_jobs)
+            model.fit(X_train, y_train)
+
+            # Fazer previsões
+            y_pred = model.predict(X_test)
+
+            # Calcular métricas de avaliação
+            entry = {
+                "model": model,
+                "mae": mean_absolute_error(y_test, y_pred),
+                "r2": r2_score(y_test, y_pred),
+                "params": params,
+                "data_fingerprint": data_fingerprint,
+            }
+            register_model(fingerprint, entry, registry_dir)
+            try:
+                with open(latest_path, "w", encoding="utf-8") as f:
+                    f.write(fingerprint)
+            except OSError:
+                pass
+
+        model, mae, r2 = entry["model"], entry["mae"], entry["r2"]
         
         # Adicionar previsões ao DataFrame
         combined_data["Area_Planted_Predicted"] = model.predict(features)
@@ -256,4 +1417,4 @@ def advanced_prediction(cotton_data, weather_data):
         # Retornar resultados e métricas
         return combined_data, mae, r2
     except Exception as e:
-        raise RuntimeError(f"Erro ao realizar previsão avançada: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Erro ao realizar previsão avançada: {e}")
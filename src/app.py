@@ -1,20 +1,35 @@
 import streamlit as st
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import plotly.express as px
-import gdown
-from data_cleaning import load_cotton_data, load_weather_data
+from data_cleaning import load_cotton_data, load_station_metadata
 from analysis import (
     analyze_seasonal_trends,
     analyze_regional_potential,
     analyze_climatic_influences,
+    correlation_matrix,
+    CORRELATION_METHODS,
     analyze_historical_trends,
     predict_planted_area,
+    predict_planted_area_by_region,
+    backtest_planted_area,
     monte_carlo_simulation,
+    monte_carlo_streaming_percentiles,
     advanced_prediction,
+    assign_stations_to_regions,
+    crop_calendar_weather,
+    query_weather_cube,
+    rollup_weather_cube,
+)
+from weather_store import (
+    GoogleDriveSource,
+    LocalDirectorySource,
+    WEATHER_BASE_FILE,
+    load_station_cube,
+    query_weather_store,
+    read_manifest,
+    store_years,
+    sync_weather_store,
 )
 from visualization import (
     plot_seasonal_trends,
@@ -24,6 +39,7 @@ from visualization import (
     plot_correlation_heatmap,
     plot_historical_trends_with_prediction,
     plot_interactive_line,
+    point_cloud_figure,
     add_coordinates_to_regions,
 )
 
@@ -34,15 +50,157 @@ GEO_DIR = BASE_DIR
 
 # ID do arquivo do Google Drive (weather_sum_all.csv)
 WEATHER_FILE_ID = "14wLGIxR1u1_XzRNFK5YQBLR0bQz8m15e"
-weather_data_path = os.path.join(DATA_DIR, "weather_sum_all.csv")
+weather_data_path = os.path.join(DATA_DIR, WEATHER_BASE_FILE)
+
+# Repositório climático particionado por ano, alimentado pelo arquivo base e
+# pelos arquivos incrementais (weather_delta_*.csv); WEATHER_STORE_DIR aponta
+# para outro diretório (ex.: em testes e benchmarks)
+weather_store_dir = os.environ.get(
+    "WEATHER_STORE_DIR", os.path.join(DATA_DIR, "weather_store")
+)
+
+# Catálogo de estações (INMET) e limites estaduais usados no mapa e na
+# associação estação -> UF
+stations_path = os.path.join(DATA_DIR, "CatalogoEstacoesAutomaticas.csv")
+geojson_path = "./data/geo/br_states.json"
+
+# Dados de algodão em memória; o mtime invalida a entrada quando a planilha muda
+@st.cache_data
+def load_cotton(filepath, mtime):
+    return load_cotton_data(filepath)
+
+# Origem dos arquivos climáticos: WEATHER_SOURCE_DIR (diretório local, ex.: em
+# testes ou sem internet), o CSV já presente em DATA_DIR ou o Google Drive
+def weather_source():
+    source_dir = os.environ.get("WEATHER_SOURCE_DIR")
+    if source_dir:
+        return LocalDirectorySource(source_dir)
+    if os.path.exists(weather_data_path):
+        return LocalDirectorySource(DATA_DIR)
+    return GoogleDriveSource({WEATHER_BASE_FILE: WEATHER_FILE_ID})
+
+# Ingere apenas os arquivos novos; a revisão devolvida invalida os caches abaixo.
+# Com o mapeamento estação -> UF, um repositório novo é particionado por ano e UF
+@st.cache_data(ttl=600)
+def sync_weather(store_dir, station_to_region=None):
+    sync_weather_store(
+        weather_source(), store_dir, station_to_region=station_to_region
+    )
+    return read_manifest(store_dir)["revision"]
+
+# Dados de clima do repositório, lendo só as partições dos anos pedidos
+@st.cache_data
+def download_and_load_weather(store_dir, revision, years=None):
+    return query_weather_store(store_dir, years=years)
+
+# Associação estação -> UF por ponto-em-polígono; sem catálogo ou GeoJSON,
+# usa o mapeamento padrão de analysis.STATION_TO_REGION
+@st.cache_data
+def load_station_regions(stations_path, geojson_path):
+    if not (os.path.exists(stations_path) and os.path.exists(geojson_path)):
+        return None
+    stations = load_station_metadata(stations_path)
+    return assign_stations_to_regions(stations, geojson_path).to_dict()
+
+# Cubo climático reagregado a partir do pré-agregado por estação do repositório,
+# sem reler os dados diários
+@st.cache_data
+def load_weather_cube(store_dir, revision, station_to_region=None):
+    return rollup_weather_cube(load_station_cube(store_dir), station_to_region)
+
+# Faixas de Monte Carlo calculadas em paralelo, reaproveitadas entre reruns
+@st.cache_data
+def load_monte_carlo_bands(historical_trends, num_simulations, forecast_years, model, trend, seed):
+    return monte_carlo_streaming_percentiles(
+        historical_trends,
+        num_simulations,
+        forecast_years,
+        model=model,
+        trend=trend,
+        seed=seed,
+    )
 
-# Função para baixar e carregar os dados de clima
+# Computações por aba, memoizadas pelos dados e valores dos widgets de entrada;
+# cada aba só recalcula quando as próprias entradas mudam
 @st.cache_data
-def download_and_load_weather(file_id, output_path):
-    if not os.path.exists(output_path):  # Baixa apenas se o arquivo não existir
-        url = f"https://drive.google.com/uc?id={file_id}"
-        gdown.download(url, output_path, quiet=False)
-    return load_weather_data(output_path)
+def compute_seasonal_trends(cotton_data, seasonal_weather, season_col="Estacao"):
+    return analyze_seasonal_trends(cotton_data, seasonal_weather, season_col)
+
+@st.cache_data
+def compute_regional_potential(cotton_data):
+    return analyze_regional_potential(cotton_data.copy(), None)
+
+# Matriz de correlação compartilhada pelas abas de influência climática e de
+# mapa de calor, calculada uma vez por dados, método e defasagem
+@st.cache_data
+def compute_correlation_matrix(cotton_data, regional_weather, method, lag):
+    return correlation_matrix(cotton_data, regional_weather, method=method, lag=lag)
+
+@st.cache_data
+def compute_climatic_influences(cotton_data, regional_weather, method="pearson", lag=0):
+    corr_matrix = compute_correlation_matrix(
+        cotton_data, regional_weather, method, lag
+    )
+    return analyze_climatic_influences(
+        cotton_data, regional_weather, corr_matrix=corr_matrix
+    )
+
+# Opções de correlação comuns às abas de influência climática e mapa de calor
+def correlation_options():
+    col1, col2 = st.columns(2)
+    method = col1.selectbox(
+        "Método de correlação:", CORRELATION_METHODS, key="corr_method"
+    )
+    lag = col2.number_input(
+        "Defasagem (clima do ano t × área do ano t + k):",
+        min_value=0,
+        max_value=5,
+        value=0,
+        step=1,
+        key="corr_lag",
+    )
+    return method, int(lag)
+
+# Dependência compartilhada pelas abas de previsão e Monte Carlo
+@st.cache_data
+def compute_historical_trends(cotton_data):
+    return analyze_historical_trends(cotton_data)
+
+@st.cache_data
+def compute_forecast(filtered_historical_trends, years_to_consider):
+    return predict_planted_area(
+        filtered_historical_trends, years_to_consider=years_to_consider
+    )
+
+# Previsão de todas as Regiões/UF em um único ajuste em lote
+@st.cache_data
+def compute_forecast_by_region(cotton_data, years_to_consider):
+    return predict_planted_area_by_region(
+        cotton_data, years_to_consider=years_to_consider
+    )
+
+# Backtesting por origem móvel (janelas × graus × origens), por série
+@st.cache_data
+def compute_backtest(data, by_region):
+    return backtest_planted_area(data, by_region=by_region)
+
+@st.cache_data
+def compute_monte_carlo(historical_trends, num_simulations, forecast_years, model, trend, seed):
+    return monte_carlo_simulation(
+        historical_trends,
+        num_simulations,
+        forecast_years,
+        model=model,
+        trend=trend,
+        seed=seed,
+    )
+
+@st.cache_data
+def compute_advanced_prediction(cotton_data, regional_weather, backend, incremental):
+    cotton_data = cotton_data.rename(columns={"Area_Plantada": "Area_Planted"})
+    return advanced_prediction(
+        cotton_data, regional_weather, backend=backend, incremental=incremental
+    )
 
 # Configuração inicial da página
 st.set_page_config(page_title="Análise de Algodão no Brasil", layout="wide")
@@ -62,8 +220,20 @@ try:
     cotton_data_path = os.path.join(DATA_DIR, "AlgodoSerieHist.xlsx")
     
     # Carrega os dados
-    cotton_data = load_cotton_data(cotton_data_path)
-    weather_data = download_and_load_weather(WEATHER_FILE_ID, weather_data_path)
+    cotton_data = load_cotton(cotton_data_path, os.path.getmtime(cotton_data_path))
+    station_to_region = load_station_regions(stations_path, geojson_path)
+    weather_revision = sync_weather(weather_store_dir, station_to_region)
+    weather_cube = load_weather_cube(
+        weather_store_dir, weather_revision, station_to_region
+    )
+
+    # Recortes do cubo usados pelas abas (ano × região × estação e ano × região)
+    seasonal_weather = query_weather_cube(
+        weather_cube, by=["Ano", "Região/UF", "Estacao"]
+    )
+    regional_weather = query_weather_cube(weather_cube, by=["Ano", "Região/UF"])
+    # Calendário agrícola: ano-safra × região × janela (safra/safrinha)
+    crop_weather = crop_calendar_weather(weather_cube)
 
     st.sidebar.success("Dados carregados com sucesso!")
 except Exception as e:
@@ -77,44 +247,59 @@ if st.sidebar.checkbox("Exibir dados brutos de algodão"):
 
 if st.sidebar.checkbox("Exibir dados meteorológicos brutos"):
     st.subheader("Dados Brutos Meteorológicos")
+    # A pré-visualização só precisa do primeiro ano armazenado
+    weather_data = download_and_load_weather(
+        weather_store_dir, weather_revision, store_years(weather_store_dir)[:1]
+    )
     st.write(weather_data.head(20))
 
-# Tabs principais
-tabs = st.tabs(
-    [
-        "Tendências Sazonais",
-        "Melhores Regiões",
-        "Influência Climática",
-        "Tendências Históricas",
-        "Correlação de Variáveis",
-        "Previsão de Area Plantada",
-        "Conclusões",        
-        "Modelo Avançado (Random Forest)",
-    ]
+# Abas principais: apenas a aba selecionada é executada em cada rerun
+TAB_NAMES = [
+    "Tendências Sazonais",
+    "Melhores Regiões",
+    "Influência Climática",
+    "Tendências Históricas",
+    "Correlação de Variáveis",
+    "Previsão de Area Plantada",
+    "Conclusões",
+    "Modelo Avançado (Random Forest)",
+]
+active_tab = st.radio(
+    "Aba", TAB_NAMES, horizontal=True, key="active_tab", label_visibility="collapsed"
 )
 
 # Aba: Tendências Sazonais
-with tabs[0]:
+if active_tab == TAB_NAMES[0]:
     st.header("Tendências Sazonais")
+    calendar_view = st.radio(
+        "Calendário:",
+        ["Estações do ano", "Janelas de plantio (safra/safrinha)"],
+        horizontal=True,
+    )
     try:
-        seasonal_trends = analyze_seasonal_trends(cotton_data, weather_data)
+        if calendar_view == "Estações do ano":
+            season_col = "Estacao"
+            seasonal_trends = compute_seasonal_trends(cotton_data, seasonal_weather)
+        else:
+            season_col = "Janela_Plantio"
+            seasonal_trends = compute_seasonal_trends(
+                cotton_data, crop_weather, season_col
+            )
         st.subheader("Gráfico")
-        plot_seasonal_trends(seasonal_trends)
+        plot_seasonal_trends(seasonal_trends, hue=season_col)
         st.subheader("Dados de Tendências Sazonais")
         st.write(seasonal_trends)
     except Exception as e:
         st.error(f"Erro ao analisar tendências sazonais: {e}")
 
 # Aba: Melhores Regiões
-with tabs[1]:
+if active_tab == TAB_NAMES[1]:
     st.header("Melhores Regiões para Plantio")
     try:
-        regional_potential = analyze_regional_potential(cotton_data, weather_data)
+        regional_potential = compute_regional_potential(cotton_data)
         st.subheader("Mapa")
 
-        # Adicione o caminho correto para o shapefile
-        shapefile_path = "./data/geo/br_states.json"
-        plot_regional_map(regional_potential, shapefile_path)
+        plot_regional_map(regional_potential, geojson_path)
 
         st.subheader("Detalhes por Região")
         st.write(regional_potential)
@@ -122,10 +307,13 @@ with tabs[1]:
         st.error(f"Erro ao analisar regiões: {e}")
 
 # Aba: Influência Climática
-with tabs[2]:
+if active_tab == TAB_NAMES[2]:
     st.header("Influência Climática")
     try:
-        climatic_influences = analyze_climatic_influences(cotton_data, weather_data)
+        corr_method, corr_lag = correlation_options()
+        climatic_influences = compute_climatic_influences(
+            cotton_data, regional_weather, corr_method, corr_lag
+        )
         st.subheader("Gráfico")
         plot_climatic_influence(climatic_influences)
         st.subheader("Detalhes da Influência Climática")
@@ -134,27 +322,35 @@ with tabs[2]:
         st.error(f"Erro ao analisar influências climáticas: {e}")
 
 # Aba: Tendências Históricas
-with tabs[3]:
+if active_tab == TAB_NAMES[3]:
     st.header("Tendências Históricas")
     try:
-        historical_trends = analyze_historical_trends(cotton_data)
+        historical_trends = compute_historical_trends(cotton_data)
+        plot_historical_trends(historical_trends)
         plot_interactive_line(historical_trends, "Ano", "Area_Planted", 
                              "Tendências Históricas da Área Plantada", "Ano", "Área Plantada (ha)")
     except Exception as e:
         st.error(f"Erro ao analisar tendências históricas: {e}")
 
 # Aba: Correlação de Variáveis
-with tabs[4]:
+if active_tab == TAB_NAMES[4]:
     st.header("Mapa de Correlação")
     try:
+        corr_method, corr_lag = correlation_options()
+        corr_matrix = compute_correlation_matrix(
+            cotton_data, regional_weather, corr_method, corr_lag
+        )
         st.subheader("Mapa de Calor")
-        plot_correlation_heatmap(cotton_data, weather_data)
+        plot_correlation_heatmap(cotton_data, regional_weather, corr_matrix)
     except Exception as e:
         st.error(f"Erro ao gerar mapa de correlação: {e}")
 
 
 # Aba: Previsão
-with tabs[5]:
+if active_tab == TAB_NAMES[5]:
+    # Bibliotecas de gráficos importadas apenas pelas abas que as usam
+    import plotly.express as px
+
     st.header("Previsão da Área Plantada")
 
     try:
@@ -167,6 +363,39 @@ with tabs[5]:
             step=1,
         )
         # Análise de tendências históricas
+        historical_trends = compute_historical_trends(cotton_data)
+
+        # Erro de previsão por janela e grau, para orientar a escolha acima
+        with st.expander("Validação da janela e do grau (backtesting)"):
+            backtest_scope = st.radio(
+                "Séries avaliadas:",
+                ["Série nacional", "Todas as Regiões/UF"],
+                horizontal=True,
+            )
+            backtest_data = (
+                historical_trends
+                if backtest_scope == "Série nacional"
+                else cotton_data
+            )
+            backtest = compute_backtest(backtest_data, False)
+            horizon = st.selectbox(
+                "Horizonte (anos à frente):", sorted(backtest["Horizonte"].unique())
+            )
+            horizon_errors = backtest[backtest["Horizonte"] == horizon]
+            fig = px.line(
+                horizon_errors.astype({"Grau": str}),
+                x="Janela",
+                y="MAPE",
+                color="Grau",
+                title=f"MAPE por janela de treino (horizonte de {horizon} ano(s))",
+                labels={"Janela": "Anos considerados", "MAPE": "MAPE (%)"},
+            )
+            st.plotly_chart(fig)
+            best = horizon_errors.loc[horizon_errors["MAPE"].idxmin()]
+            st.info(
+                f"Menor erro: {int(best['Janela'])} anos, grau {int(best['Grau'])} "
+                f"(MAPE de {best['MAPE']:.1f}% e MAE de {best['MAE']:.1f} ha)."
+            )
 
         if historical_trends.empty:
             st.error("Dados históricos de área plantada não estão disponíveis.")
@@ -198,8 +427,8 @@ with tabs[5]:
             else:
                 try:
                     # Previsão com dados filtrados
-                    predicted_areas = predict_planted_area(
-                        filtered_historical_trends, years_to_consider=years_to_consider
+                    predicted_areas = compute_forecast(
+                        filtered_historical_trends, years_to_consider
                     )
 
                     if predicted_areas.empty:
@@ -219,11 +448,32 @@ with tabs[5]:
                 except RuntimeError as prediction_error:
                     st.error(f"Erro ao prever área plantada: {prediction_error}")
 
+        # Previsão por Região/UF, com a mesma janela de anos
+        st.subheader("Previsão por Região/UF")
+        regional_forecast = compute_forecast_by_region(cotton_data, years_to_consider)
+        st.write(
+            "Área plantada prevista por Região/UF (ha):",
+            regional_forecast.pivot(
+                index="Região/UF", columns="Ano", values="Area_Planted_Predicted"
+            ),
+        )
+        if os.path.exists(geojson_path):
+            final_year = regional_forecast["Ano"].max()
+            plot_regional_map(
+                regional_forecast[regional_forecast["Ano"] == final_year],
+                geojson_path,
+                value_col="Area_Planted_Predicted",
+                legend_name=f"Área Plantada Prevista em {final_year} (ha)",
+            )
+
     except Exception as e:
         st.error(f"Erro ao analisar tendências históricas com previsão: {e}")
 
 
-with tabs[6]:
+if active_tab == TAB_NAMES[6]:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     st.header("Simulações de Monte Carlo")
     st.markdown(
         """
@@ -234,9 +484,47 @@ with tabs[6]:
     try:
         num_simulations = st.number_input("Número de Simulações:", min_value=100, max_value=10000, value=1000, step=100, key="num_simulations_mc")
         forecast_years = st.number_input("Anos de Previsão:", min_value=1, max_value=20, value=10, step=1, key="forecast_years_mc")
-        
+        mc_models = {
+            "Média histórica (i.i.d.)": "iid",
+            "Passeio aleatório": "random_walk",
+            "Autorregressivo AR(1)": "ar1",
+        }
+        mc_model = st.selectbox("Modelo das Simulações:", list(mc_models), key="model_mc")
+        mc_trend = st.checkbox("Considerar tendência histórica", value=False, key="trend_mc")
+        mc_seed = st.number_input("Semente aleatória:", min_value=0, value=42, step=1, key="seed_mc")
+
         # Realizar as simulações de Monte Carlo
-        simulation_results = monte_carlo_simulation(historical_trends, num_simulations, forecast_years)
+        historical_trends = compute_historical_trends(cotton_data)
+        simulation_results = compute_monte_carlo(
+            historical_trends,
+            num_simulations,
+            forecast_years,
+            mc_models[mc_model],
+            mc_trend,
+            mc_seed,
+        )
+
+        st.subheader("Faixas de Previsão (P5, P50, P95)")
+        # Execuções maiores ficam para o gerador de relatórios (report.py)
+        band_paths = st.number_input(
+            "Trajetórias para as faixas de previsão:",
+            min_value=10_000,
+            max_value=2_000_000,
+            value=100_000,
+            step=100_000,
+            key="band_paths_mc",
+            help="Para milhões de trajetórias, use src/report.py --simulacoes.",
+        )
+        st.write(
+            load_monte_carlo_bands(
+                historical_trends,
+                band_paths,
+                forecast_years,
+                mc_models[mc_model],
+                mc_trend,
+                mc_seed,
+            )
+        )
         
         st.subheader("Distribuição das Simulações")
         st.markdown(
@@ -254,6 +542,7 @@ with tabs[6]:
         plt.legend()
         plt.grid(True, linestyle='--', alpha=0.7)
         st.pyplot(plt)
+        plt.close()
 
         st.subheader("Relação entre Variáveis Climáticas e Área Plantada")
         st.markdown(
@@ -263,8 +552,9 @@ with tabs[6]:
         )
         
         # Definir distribuições de probabilidade para variáveis climáticas
-        temperatura_media = np.random.normal(loc=25, scale=5, size=num_simulations)  # média de 25°C, desvio padrão de 5
-        precipitacao = np.random.normal(loc=100, scale=30, size=num_simulations)  # média de 100mm, desvio padrão de 30mm
+        rng = np.random.default_rng(mc_seed)
+        temperatura_media = rng.normal(loc=25, scale=5, size=num_simulations)  # média de 25°C, desvio padrão de 5
+        precipitacao = rng.normal(loc=100, scale=30, size=num_simulations)  # média de 100mm, desvio padrão de 30mm
         area_plantada = simulation_results.values.flatten()[:num_simulations]  # Garantir o mesmo comprimento
 
         # Criar DataFrame com os resultados das simulações
@@ -274,57 +564,47 @@ with tabs[6]:
             "Área Plantada (ha)": area_plantada
         })
 
-        # Gráfico de Dispersão: Temperatura vs Área Plantada
-        st.markdown("#### Relação entre Temperatura e Área Plantada")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(
-            x='Temperatura Média (°C)', 
-            y='Área Plantada (ha)', 
-            data=climatic_simulations, 
-            hue='Precipitação (mm)',  # Cor dos pontos baseada na precipitação
-            palette='coolwarm',  # Escala de cores
-            size='Precipitação (mm)',  # Tamanho dos pontos baseado na precipitação
-            sizes=(50, 200),  # Tamanho mínimo e máximo dos pontos
-            alpha=0.7,  # Transparência dos pontos
-            ax=ax
-        )
-        plt.title("Temperatura Média vs Área Plantada", fontsize=16)
-        plt.xlabel("Temperatura Média (°C)", fontsize=14)
-        plt.ylabel("Área Plantada (ha)", fontsize=14)
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend(title="Precipitação (mm)", bbox_to_anchor=(1.05, 1), loc='upper left')
-        st.pyplot(fig)
-
-        # Gráfico de Dispersão: Precipitação vs Área Plantada
-        st.markdown("#### Relação entre Precipitação e Área Plantada")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(
-            x='Precipitação (mm)', 
-            y='Área Plantada (ha)', 
-            data=climatic_simulations, 
-            hue='Temperatura Média (°C)',  # Cor dos pontos baseada na temperatura
-            palette='viridis',  # Escala de cores
-            size='Temperatura Média (°C)',  # Tamanho dos pontos baseado na temperatura
-            sizes=(50, 200),  # Tamanho mínimo e máximo dos pontos
-            alpha=0.7,  # Transparência dos pontos
-            ax=ax
-        )
-        plt.title("Precipitação vs Área Plantada", fontsize=16)
-        plt.xlabel("Precipitação (mm)", fontsize=14)
-        plt.ylabel("Área Plantada (ha)", fontsize=14)
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.legend(title="Temperatura Média (°C)", bbox_to_anchor=(1.05, 1), loc='upper left')
-        st.pyplot(fig)
+        # Gráficos de Dispersão: agregados em grade (WebGL) com muitos pontos
+        scatter_views = [
+            ("Temperatura", "Temperatura Média (°C)", "Precipitação (mm)", "RdBu_r"),
+            ("Precipitação", "Precipitação (mm)", "Temperatura Média (°C)", "Viridis"),
+        ]
+        for name, x_col, color_col, color_scale in scatter_views:
+            st.markdown(f"#### Relação entre {name} e Área Plantada")
+            fig = point_cloud_figure(
+                climatic_simulations,
+                x_col,
+                "Área Plantada (ha)",
+                color_col=color_col,
+                title=f"{name} vs Área Plantada",
+                color_scale=color_scale,
+            )
+            st.plotly_chart(fig)
 
     except Exception as e:
         st.error(f"Erro ao realizar simulações de Monte Carlo: {e}")
 
 #v2 Aba: Modelo Avançado (Random Forest)
-with tabs[7]:
+if active_tab == TAB_NAMES[7]:
+    import plotly.express as px
+
     st.header("Previsão com Modelo Avançado (Random Forest)")
     try:
+        backends = {
+            "Random Forest (paralelo)": "random_forest",
+            "Gradient Boosting por histogramas": "hist_gradient_boosting",
+        }
+        backend = st.selectbox("Algoritmo:", list(backends), key="backend_rf")
+        incremental = st.checkbox(
+            "Treino incremental (acrescentar árvores ao último modelo)",
+            value=False,
+            key="incremental_rf",
+        )
+
         # Realizar previsões com o modelo avançado
-        advanced_results, mae, r2 = advanced_prediction(cotton_data, weather_data)
+        advanced_results, mae, r2 = compute_advanced_prediction(
+            cotton_data, regional_weather, backends[backend], incremental
+        )
         
         # Exibir métricas de avaliação
         st.subheader("Métricas de Avaliação do Modelo")
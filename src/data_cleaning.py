@@ -1,75 +1,403 @@
+import hashlib
+import os
+import re
+
+import numpy as np
 import pandas as pd
 
 
-def load_cotton_data(filepath: str) -> pd.DataFrame:
+# Versão do formato do cache colunar; incremente ao alterar as colunas derivadas
+COTTON_CACHE_VERSION = 3
+
+# Estações do ano (Hemisfério Sul) e código da estação de cada mês (índice 1–12)
+SEASONS = ["Verão", "Outono", "Inverno", "Primavera"]
+SEASON_BY_MONTH = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+# Janelas de plantio do algodão: primeira safra (out–dez), safrinha após a soja
+# (jan–fev) e entressafra nos demais meses
+PLANTING_WINDOWS = ["Safra", "Safrinha", "Entressafra"]
+WINDOW_BY_MONTH = np.array([-1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 0, 0, 0], dtype=np.int8)
+
+# O ano-safra começa em agosto e recebe o ano inicial ("2023/24" -> 2023), como
+# nos cabeçalhos da CONAB
+CROP_YEAR_START_MONTH = 8
+
+# Colunas de calendário derivadas da data (não são variáveis climáticas)
+CALENDAR_COLUMNS = ("Ano", "Mes", "Ano_Safra", "Dia_Ano")
+
+# Esquema compacto das tabelas de algodão e clima
+CATEGORY_COLUMNS = ("Região/UF", "Estacao", "Janela_Plantio", "ESTACAO")
+INTEGER_COLUMNS = {
+    "Ano": "int16",
+    "Mes": "int8",
+    "Ano_Safra": "int16",
+    "Dia_Ano": "int16",
+}
+# Colunas float mantidas em float64 (áreas, produção e coordenadas); as demais
+# colunas float, como as variáveis climáticas, são reduzidas para float32
+FLOAT64_COLUMNS = (
+    "Area_Plantada",
+    "Area_Planted",
+    "Area_Planted_Predicted",
+    "Producao",
+    "Produtividade",
+    "LATITUDE",
+    "LONGITUDE",
+)
+
+
+def apply_compact_schema(data: pd.DataFrame) -> pd.DataFrame:
     """
-    Carrega e processa os dados de algodão do arquivo Excel.
+    Converte as colunas conhecidas para os tipos compactos do esquema.
+
+    Região/UF, Estacao e ESTACAO viram categóricas, Ano e Mes inteiros pequenos
+    (quando não há nulos) e as variáveis climáticas float32. Colunas ausentes são
+    ignoradas, de modo que a função pode ser aplicada após qualquer melt, groupby
+    ou merge para restaurar os tipos perdidos.
     """
-    try:
-        data = pd.read_excel(filepath, engine="openpyxl", skiprows=4, header=None)
-        col_count = len(data.columns)
+    dtypes = {}
+    for col in CATEGORY_COLUMNS:
+        if col in data.columns and not isinstance(
+            data[col].dtype, pd.CategoricalDtype
+        ):
+            dtypes[col] = "category"
+    for col, dtype in INTEGER_COLUMNS.items():
+        if (
+            col in data.columns
+            and data[col].dtype != dtype
+            and pd.api.types.is_numeric_dtype(data[col])
+            and data[col].notna().all()
+        ):
+            dtypes[col] = dtype
+    for col in data.select_dtypes(include="float64").columns:
+        if col not in FLOAT64_COLUMNS and col not in dtypes:
+            dtypes[col] = "float32"
+
+    return data.astype(dtypes) if dtypes else data
+
+
+def memory_report(stages: dict) -> pd.DataFrame:
+    """
+    Resume o consumo de memória de cada etapa ({nome: DataFrame}).
 
-        # Criar nomes de colunas dinamicamente
-        col_names = ["Região/UF"] + [
-            str(year) for year in range(1976, 1976 + col_count - 1)
+    Returns:
+        pd.DataFrame: Etapa, Linhas, Colunas e Bytes (incluindo strings).
+    """
+    return pd.DataFrame(
+        [
+            {
+                "Etapa": name,
+                "Linhas": len(data),
+                "Colunas": data.shape[1],
+                "Bytes": int(data.memory_usage(deep=True).sum()),
+            }
+            for name, data in stages.items()
         ]
-        data.columns = col_names[:col_count]
+    )
+
+
+def _content_fingerprint(filepath: str) -> str:
+    """
+    Gera uma assinatura a partir do conteúdo do arquivo (para arquivos pequenos).
+    """
+    digest = hashlib.sha1(f"{COTTON_CACHE_VERSION}:".encode("utf-8"))
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _cache_path(filepath: str, fingerprint: str, cache_dir: str = None) -> str:
+    """
+    Retorna o caminho do cache Parquet correspondente ao estado atual do arquivo.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(filepath)), ".cache")
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(cache_dir, f"{name}-{fingerprint}.parquet")
+
+
+def _read_cache(cache_path: str):
+    """
+    Lê o cache colunar (memory-mapped); retorna None se ausente ou ilegível.
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        return pd.read_parquet(cache_path, engine="pyarrow", memory_map=True)
+    except Exception:
+        # Cache corrompido ou pyarrow indisponível: volta ao arquivo original
+        return None
+
+
+def _write_cache(data: pd.DataFrame, cache_path: str) -> None:
+    """
+    Grava o cache colunar de forma atômica e remove versões antigas do mesmo arquivo.
+    """
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        tmp_path = f"{cache_path}.tmp"
+        data.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, cache_path)
+
+        # Caches de versões anteriores do CSV ficam obsoletos
+        prefix = os.path.basename(cache_path).rsplit("-", 1)[0] + "-"
+        for entry in os.listdir(cache_dir):
+            stale = os.path.join(cache_dir, entry)
+            is_stale = entry.startswith(prefix) and entry.endswith(".parquet")
+            if is_stale and stale != cache_path:
+                os.remove(stale)
+    except Exception:
+        # Diretório somente leitura (ex.: container): segue sem cache
+        pass
+
+
+# Planilhas da série histórica da CONAB e a coluna correspondente na tabela longa
+CONAB_SERIES = {
+    "Área": "Area_Plantada",
+    "Produção Algodão em Caroço": "Producao",
+    "Produtividade Algodão em Caroço": "Produtividade",
+}
+
+
+def _parse_harvest_year(value):
+    """
+    Converte cabeçalhos de safra ("1976/77", "2024/25 Previsão (¹)") no ano inicial.
+    """
+    match = re.match(r"\s*(\d{4})/\d{2}", str(value)) if value is not None else None
+    return int(match.group(1)) if match else None
+
+
+def _iter_sheet_blocks(rows):
+    """
+    Percorre as linhas de uma planilha e produz um bloco por cabeçalho "REGIÃO/UF".
+
+    Cada bloco é um par (colunas de safra {índice: ano}, linhas de dados) e termina
+    na primeira linha vazia, de legenda ou de fonte.
+    """
+    years, records = None, []
+    for row in rows:
+        label = str(row[0]).strip() if row and row[0] is not None else ""
+
+        if label.upper() == "REGIÃO/UF":
+            if years and records:
+                yield years, records
+            years, records = {}, []
+            for i, cell in enumerate(row[1:], start=1):
+                year = _parse_harvest_year(cell)
+                if year is not None:
+                    years[i] = year
+        elif years is not None:
+            if not label or label.startswith(("Legenda", "Fonte")):
+                if records:
+                    yield years, records
+                years, records = None, []
+            else:
+                records.append((label, row))
+
+    if years and records:
+        yield years, records
+
+
+def _block_to_long(years: dict, records: list, value_name: str) -> pd.DataFrame:
+    """
+    Converte um bloco da planilha para o formato longo (Região/UF, Ano, valor).
+    """
+    columns = list(years)
+    block = pd.DataFrame(
+        [[row[i] if i < len(row) else None for i in columns] for _, row in records],
+        columns=[years[i] for i in columns],
+    )
+    block.insert(0, "Região/UF", [label for label, _ in records])
+
+    data_long = block.melt(
+        id_vars=["Região/UF"], var_name="Ano", value_name=value_name
+    )
+    data_long[value_name] = pd.to_numeric(data_long[value_name], errors="coerce")
+    return data_long
+
+
+def load_cotton_series(
+    filepath: str, use_cache: bool = True, cache_dir: str = None
+) -> pd.DataFrame:
+    """
+    Lê as séries de área, produção e produtividade da CONAB em uma única passada.
+
+    A pasta de trabalho é aberta uma vez em modo somente leitura (streaming) e
+    cada planilha de ``CONAB_SERIES`` é dividida em blocos pelos cabeçalhos de
+    safra ("1976/77" -> 1976). Com ``use_cache``, o resultado é guardado em um
+    cache Parquet identificado pelo conteúdo da planilha.
+
+    Returns:
+        pd.DataFrame: Tabela longa com Região/UF, Ano e uma coluna por série
+        (Area_Plantada, Producao, Produtividade).
+    """
+    try:
+        cache_path = None
+        if use_cache:
+            fingerprint = _content_fingerprint(filepath)
+            cache_path = _cache_path(filepath, fingerprint, cache_dir)
+            series = _read_cache(cache_path)
+            if series is not None:
+                return series
+
+        # openpyxl só é importado quando o cache não serve
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            frames = []
+            for sheet_name, value_name in CONAB_SERIES.items():
+                if sheet_name not in workbook.sheetnames:
+                    continue
+                rows = workbook[sheet_name].iter_rows(values_only=True)
+                blocks = [
+                    _block_to_long(years, records, value_name)
+                    for years, records in _iter_sheet_blocks(rows)
+                ]
+                if blocks:
+                    frame = pd.concat(blocks, ignore_index=True)
+                    frame = frame.drop_duplicates(subset=["Região/UF", "Ano"])
+                    frames.append(frame.set_index(["Região/UF", "Ano"]))
+        finally:
+            workbook.close()
+
+        if not frames:
+            raise ValueError("Nenhuma série da CONAB encontrada na planilha.")
+
+        # Alinhar as séries por Região/UF e Ano, preservando a ordem da planilha
+        series = pd.concat(frames, axis=1, sort=False).reset_index()
+        for value_name in CONAB_SERIES.values():
+            if value_name not in series.columns:
+                series[value_name] = float("nan")
 
         # Excluir totais e valores agregados
-        data = data[~data["Região/UF"].str.contains("BRASIL|NORTE/NORDESTE", na=False)]
+        series = series[
+            ~series["Região/UF"].str.contains("BRASIL|NORTE/NORDESTE", na=False)
+        ]
+        series = series.dropna(subset=list(CONAB_SERIES.values()), how="all")
 
-        # Transformar para formato longo
-        data_long = data.melt(
-            id_vars=["Região/UF"], var_name="Ano", value_name="Area_Plantada"
-        )
-        data_long["Area_Plantada"] = pd.to_numeric(
-            data_long["Area_Plantada"], errors="coerce"
-        )
-        data_long["Ano"] = pd.to_numeric(
-            data_long["Ano"].str.extract(r"(\d{4})")[0], errors="coerce"
-        )
+        # Tipos compactos: UF categórica e ano como inteiro pequeno
+        series = apply_compact_schema(series.reset_index(drop=True))
+
+        if cache_path is not None:
+            _write_cache(series, cache_path)
+
+        return series
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar séries da CONAB: {e}")
+
+
+def load_cotton_data(
+    filepath: str, use_cache: bool = True, cache_dir: str = None
+) -> pd.DataFrame:
+    """
+    Carrega e processa os dados de algodão do arquivo Excel.
+
+    Usa a leitura única de ``load_cotton_series`` e mantém apenas a área
+    plantada; o openpyxl só é usado quando a planilha muda.
+    """
+    try:
+        series = load_cotton_series(filepath, use_cache=use_cache, cache_dir=cache_dir)
 
         # Remover valores ausentes
-        data_long.dropna(subset=["Ano", "Area_Plantada"], inplace=True)
+        data_long = series[["Região/UF", "Ano", "Area_Plantada"]].dropna(
+            subset=["Area_Plantada"]
+        )
+        data_long = data_long.reset_index(drop=True)
+        data_long["Região/UF"] = data_long["Região/UF"].cat.remove_unused_categories()
 
         return data_long
     except Exception as e:
         raise RuntimeError(f"Erro ao carregar dados de algodão: {e}")
 
 
-def load_weather_data(filepath: str) -> pd.DataFrame:
+def load_station_metadata(filepath: str) -> pd.DataFrame:
     """
-    Carrega e processa os dados climáticos.
+    Carrega o catálogo de estações meteorológicas (código e coordenadas).
+
+    Aceita o catálogo do INMET (CD_ESTACAO, VL_LATITUDE, VL_LONGITUDE, separado
+    por ";" e com vírgula decimal) ou um CSV já com ESTACAO, LATITUDE e LONGITUDE.
     """
     try:
-        # Carregar os dados
-        data = pd.read_csv(filepath)
-
-        # Converter a coluna DATA para datetime
-        data["DATA"] = pd.to_datetime(data["DATA (YYYY-MM-DD)"], errors="coerce")
-        data["Ano"] = data["DATA"].dt.year
-        data["Mes"] = data["DATA"].dt.month
-
-        # Definir estações do ano com base nos meses
-        season_bins = [0, 2, 5, 8, 11, 12]  # Divisão em meses
-        season_labels = ["Verão", "Outono", "Inverno", "Primavera", "Verão"]
-        data["Estacao"] = pd.cut(
-            data["Mes"],
-            bins=season_bins,
-            labels=season_labels,
-            ordered=False,
-            right=True,
+        data = pd.read_csv(filepath, sep=None, engine="python", dtype=str)
+        data = data.rename(
+            columns={
+                "CD_ESTACAO": "ESTACAO",
+                "VL_LATITUDE": "LATITUDE",
+                "VL_LONGITUDE": "LONGITUDE",
+            }
         )
 
-        # Verificar duplicatas ou problemas
-        if data["Estacao"].isna().any():
-            raise ValueError(
-                "Erro ao mapear meses para estações: valores nulos detectados."
+        # Coordenadas podem vir com vírgula decimal
+        for col in ["LATITUDE", "LONGITUDE"]:
+            data[col] = pd.to_numeric(
+                data[col].str.replace(",", ".", regex=False), errors="coerce"
             )
 
-        print("Pré-visualização dos dados meteorológicos:")
-        print(data.head())
+        # Estações sem coordenadas não podem ser localizadas
+        data = data.dropna(subset=["ESTACAO", "LATITUDE", "LONGITUDE"])
+        data = data.drop_duplicates(subset="ESTACAO")
 
-        return data
+        return data[["ESTACAO", "LATITUDE", "LONGITUDE"]].reset_index(drop=True)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao carregar catálogo de estações: {e}")
+
+
+def _derive_weather_columns(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deriva DATA e as colunas de calendário a partir da coluna de data bruta.
+
+    Ano, Mes, Dia_Ano, Ano_Safra, Estacao e Janela_Plantio são calculados em uma
+    única passada vetorizada; estação e janela vêm de tabelas mês -> código.
+    """
+    # Converter a coluna DATA para datetime
+    data["DATA"] = pd.to_datetime(
+        data["DATA (YYYY-MM-DD)"], format="%Y-%m-%d", errors="coerce"
+    )
+    if data["DATA"].isna().any():
+        raise ValueError("Erro ao mapear meses para estações: datas inválidas.")
+
+    dates = data["DATA"].dt
+    year = dates.year.to_numpy(dtype=np.int16)
+    month = dates.month.to_numpy(dtype=np.int8)
+
+    data["Ano"] = year
+    data["Mes"] = month
+    data["Dia_Ano"] = dates.dayofyear.to_numpy(dtype=np.int16)
+    data["Ano_Safra"] = year - (month < CROP_YEAR_START_MONTH).astype(np.int16)
+    data["Estacao"] = pd.Categorical.from_codes(SEASON_BY_MONTH[month], SEASONS)
+    data["Janela_Plantio"] = pd.Categorical.from_codes(
+        WINDOW_BY_MONTH[month], PLANTING_WINDOWS
+    )
+
+    return data
+
+
+def load_weather_data(filepath: str) -> pd.DataFrame:
+    """
+    Carrega e processa os dados climáticos.
+
+    Lê o CSV inteiro; o app e os relatórios consultam o repositório climático
+    (weather_store), que persiste os dados em Parquet e os ingere em blocos.
+    """
+    try:
+        # Carregar os dados
+        data = pd.read_csv(filepath)
+        return apply_compact_schema(_derive_weather_columns(data))
     except Exception as e:
         raise RuntimeError(f"Erro ao carregar dados meteorológicos: {e}")
+
+
+def iter_weather_chunks(filepath: str, chunksize: int = 500_000):
+    """
+    Lê o CSV climático em blocos, derivando as colunas de calendário em cada
+    bloco; é a leitura usada na ingestão do repositório climático.
+
+    As variáveis climáticas permanecem em float64 para que as somas acumuladas
+    entre blocos não percam precisão.
+    """
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        yield _derive_weather_columns(chunk)
@@ -0,0 +1,321 @@
+"""
+Gera em lote, sem o Streamlit, os relatórios das análises do painel.
+
+Para cada Região/UF (ou "BRASIL", a série nacional) e cada modelo de Monte Carlo
+pedido, executa as análises sazonal, climática, histórica, de previsão, de Monte
+Carlo e do modelo avançado em processos paralelos. Cada relatório é gravado em
+``<saida>/<UF>/<modelo>/`` com as tabelas em Parquet, os gráficos em PNG e um
+``relatorio.html``; o potencial regional (e o mapa, se houver GeoJSON) e um
+``index.html`` ficam na raiz da saída.
+
+Uso:
+    python src/report.py --ufs MT BA GO --modelos iid ar1 --saida relatorios
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analysis import (
+    MONTE_CARLO_MODELS,
+    advanced_prediction,
+    analyze_climatic_influences,
+    analyze_historical_trends,
+    analyze_regional_potential,
+    analyze_seasonal_trends,
+    assign_stations_to_regions,
+    correlation_matrix,
+    monte_carlo_streaming_percentiles,
+    predict_planted_area,
+    query_weather_cube,
+    rollup_weather_cube,
+)
+from data_cleaning import load_cotton_data, load_station_metadata
+from visualization import figure_png, regional_map
+from weather_store import (
+    LocalDirectorySource,
+    WEATHER_BASE_FILE,
+    load_station_cube,
+    sync_weather_store,
+)
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+NATIONAL = "BRASIL"
+
+
+def load_inputs(data_dir, geojson_path):
+    """
+    Carrega o algodão e os recortes climáticos usados pelos relatórios.
+
+    O repositório climático (``<data_dir>/weather_store``) é sincronizado com os
+    arquivos locais de ``data_dir``; sem dados climáticos, os recortes são None
+    e as seções que dependem deles são registradas como indisponíveis.
+    """
+    cotton_data = load_cotton_data(os.path.join(data_dir, "AlgodoSerieHist.xlsx"))
+
+    station_to_region = None
+    stations_path = os.path.join(data_dir, "CatalogoEstacoesAutomaticas.csv")
+    if os.path.exists(stations_path) and os.path.exists(geojson_path):
+        stations = load_station_metadata(stations_path)
+        station_to_region = assign_stations_to_regions(
+            stations, geojson_path
+        ).to_dict()
+
+    store_dir = os.path.join(data_dir, "weather_store")
+    if os.path.exists(os.path.join(data_dir, WEATHER_BASE_FILE)):
+        sync_weather_store(
+            LocalDirectorySource(data_dir),
+            store_dir,
+            station_to_region=station_to_region,
+        )
+    station_cube = load_station_cube(store_dir)
+    if station_cube is None:
+        return cotton_data, None, None
+
+    weather_cube = rollup_weather_cube(station_cube, station_to_region)
+    seasonal_weather = query_weather_cube(
+        weather_cube, by=["Ano", "Região/UF", "Estacao"]
+    )
+    regional_weather = query_weather_cube(weather_cube, by=["Ano", "Região/UF"])
+    return cotton_data, seasonal_weather, regional_weather
+
+
+def _select_region(data, region):
+    """
+    Recorta uma Região/UF; a série nacional usa todas as linhas.
+    """
+    if data is None or region == NATIONAL:
+        return data
+    return data[data["Região/UF"].astype(str) == region]
+
+
+def _write_section(output_dir, name, table=None, figure=None):
+    """
+    Grava a tabela (Parquet) e a figura (PNG) de uma seção do relatório.
+    """
+    if table is not None:
+        table = table.to_frame() if isinstance(table, pd.Series) else table
+        table.to_parquet(os.path.join(output_dir, f"{name}.parquet"))
+    if figure is not None:
+        with open(os.path.join(output_dir, f"{name}.png"), "wb") as f:
+            f.write(figure)
+    return {"name": name, "table": table, "figure": figure is not None}
+
+
+def build_report(
+    region,
+    model,
+    cotton_data,
+    seasonal_weather,
+    regional_weather,
+    output_dir,
+    years_to_consider=10,
+    num_simulations=1_000_000,
+    forecast_years=10,
+    seed=42,
+):
+    """
+    Executa as análises de uma Região/UF e um modelo de Monte Carlo.
+
+    Cada seção é independente: uma falha vira uma mensagem no relatório e as
+    demais seções continuam. Devolve o caminho do ``relatorio.html`` e a lista
+    de erros.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cotton_data = _select_region(cotton_data, region)
+    seasonal_weather = _select_region(seasonal_weather, region)
+    regional_weather = _select_region(regional_weather, region)
+    sections, errors = [], []
+
+    def run(title, func):
+        try:
+            sections.append((title, func()))
+        except Exception as e:
+            errors.append(f"{title}: {e}")
+
+    def require_weather(weather):
+        if weather is None or weather.empty:
+            raise ValueError("dados climáticos indisponíveis")
+        return weather
+
+    def seasonal():
+        trends = analyze_seasonal_trends(
+            cotton_data, require_weather(seasonal_weather)
+        )
+        figure = figure_png("seasonal_trends", trends, hue="Estacao")
+        return _write_section(output_dir, "tendencias_sazonais", trends, figure)
+
+    def climatic():
+        corr_matrix = correlation_matrix(
+            cotton_data, require_weather(regional_weather)
+        )
+        influences = analyze_climatic_influences(
+            cotton_data, regional_weather, corr_matrix=corr_matrix
+        )
+        _write_section(
+            output_dir,
+            "mapa_correlacao",
+            corr_matrix,
+            figure_png("correlation_heatmap", corr_matrix),
+        )
+        figure = figure_png("climatic_influence", influences)
+        return _write_section(output_dir, "influencia_climatica", influences, figure)
+
+    historical_trends = analyze_historical_trends(cotton_data)
+
+    def historical():
+        figure = figure_png("historical_trends", historical_trends)
+        return _write_section(
+            output_dir, "tendencias_historicas", historical_trends, figure
+        )
+
+    def forecast():
+        years = sorted(historical_trends["Ano"].unique())[-years_to_consider:]
+        recent = historical_trends[historical_trends["Ano"].isin(years)]
+        predicted = predict_planted_area(recent, years_to_consider=years_to_consider)
+        figure = figure_png("trends_with_prediction", recent, predicted)
+        return _write_section(output_dir, "previsao", predicted, figure)
+
+    def monte_carlo():
+        bands = monte_carlo_streaming_percentiles(
+            historical_trends,
+            num_simulations,
+            forecast_years,
+            model=model,
+            seed=seed,
+            n_jobs=1,
+        )
+        return _write_section(output_dir, "monte_carlo", bands)
+
+    def advanced():
+        results, mae, r2 = advanced_prediction(
+            cotton_data.rename(columns={"Area_Plantada": "Area_Planted"}),
+            require_weather(regional_weather),
+            n_jobs=1,
+        )
+        metrics = pd.DataFrame([{"MAE": mae, "R2": r2}])
+        _write_section(output_dir, "modelo_avancado_metricas", metrics)
+        return _write_section(output_dir, "modelo_avancado", results)
+
+    run("Tendências Sazonais", seasonal)
+    run("Influência Climática", climatic)
+    run("Tendências Históricas", historical)
+    run("Previsão de Área Plantada", forecast)
+    run(f"Simulações de Monte Carlo ({model})", monte_carlo)
+    run("Modelo Avançado", advanced)
+
+    path = os.path.join(output_dir, "relatorio.html")
+    _write_html(path, f"{region} — {model}", sections, errors)
+    return path, errors
+
+
+def _write_html(path, title, sections, errors):
+    """
+    Monta uma página HTML estática com as figuras e as primeiras linhas.
+    """
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    for error in errors:
+        parts.append(f"<p style='color:#b00'>Erro em {html.escape(error)}</p>")
+    for heading, section in sections:
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        if section["figure"]:
+            parts.append(f"<img src='{section['name']}.png' width='800'>")
+        if section["table"] is not None:
+            parts.append(section["table"].head(50).to_html(float_format="%.2f"))
+            parquet = f"{section['name']}.parquet"
+            parts.append(f"<p><a href='{parquet}'>{parquet}</a></p>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title></head><body>"
+            + "\n".join(parts)
+            + "</body></html>"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--ufs", nargs="+", default=None, help="UFs (padrão: todas e BRASIL)"
+    )
+    parser.add_argument(
+        "--modelos", nargs="+", default=["iid"], choices=MONTE_CARLO_MODELS
+    )
+    parser.add_argument("--saida", default="relatorios")
+    parser.add_argument("--dados", default=BASE_DIR)
+    parser.add_argument("--geojson", default="./data/geo/br_states.json")
+    parser.add_argument("--anos", type=int, default=10)
+    parser.add_argument("--simulacoes", type=int, default=1_000_000)
+    parser.add_argument("--anos-previsao", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cotton_data, seasonal_weather, regional_weather = load_inputs(
+        args.dados, args.geojson
+    )
+    regions = args.ufs or [NATIONAL] + sorted(
+        cotton_data["Região/UF"].astype(str).unique()
+    )
+    os.makedirs(args.saida, exist_ok=True)
+
+    # Potencial regional (comparação entre UFs) e mapa, uma vez por lote
+    regional_potential = analyze_regional_potential(cotton_data.copy(), None)
+    regional_potential.to_parquet(
+        os.path.join(args.saida, "melhores_regioes.parquet")
+    )
+    if os.path.exists(args.geojson):
+        regional_map(regional_potential, args.geojson).save(
+            os.path.join(args.saida, "melhores_regioes.html")
+        )
+
+    jobs = [(region, model) for region in regions for model in args.modelos]
+    tasks = [
+        (
+            region,
+            model,
+            cotton_data,
+            seasonal_weather,
+            regional_weather,
+            os.path.join(args.saida, region, model),
+            args.anos,
+            args.simulacoes,
+            args.anos_previsao,
+            args.semente,
+        )
+        for region, model in jobs
+    ]
+    if args.workers == 1 or len(tasks) <= 1:
+        outputs = [build_report(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            outputs = list(executor.map(build_report, *zip(*tasks)))
+
+    links = []
+    for (region, model), (path, errors) in zip(jobs, outputs):
+        relative = os.path.relpath(path, args.saida)
+        status = f" ({len(errors)} seção(ões) com erro)" if errors else ""
+        links.append(f"<li><a href='{relative}'>{region} — {model}</a>{status}</li>")
+        for error in errors:
+            print(f"[{region}/{model}] {error}")
+    with open(os.path.join(args.saida, "index.html"), "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            "<title>Relatórios de Algodão</title></head><body>"
+            "<h1>Relatórios de Algodão</h1>"
+            "<p><a href='melhores_regioes.parquet'>Melhores regiões</a></p>"
+            f"<ul>{''.join(links)}</ul></body></html>"
+        )
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(jobs)} relatório(s) em {args.saida} ({elapsed:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
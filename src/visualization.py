@@ -1,11 +1,130 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-import geopandas as gpd
-import plotly.express as px
-import folium
-from streamlit_folium import st_folium
+from analysis import correlation_matrix, keyed_merge, weather_means
+
+if TYPE_CHECKING:
+    import folium
+
+# Bibliotecas de gráficos e mapas (seaborn, matplotlib, plotly, folium,
+# geopandas) são importadas nas funções que as usam: cada aba carrega apenas
+# o que desenha, o que reduz a inicialização do app
+
+# Simplificação dos limites estaduais no mapa: tolerância em graus (~1 km) e
+# casas decimais mantidas nas coordenadas (~100 m)
+MAP_SIMPLIFY_TOLERANCE = 0.01
+MAP_COORDINATE_DECIMALS = 3
+
+# Acima deste número de pontos os gráficos de dispersão são agregados em uma
+# grade de SCATTER_BINS × SCATTER_BINS células e as linhas reduzidas por LTTB
+POINT_RENDER_THRESHOLD = 5_000
+SCATTER_BINS = 60
+LINE_MAX_POINTS = 2_000
+
+# Figuras matplotlib renderizadas (PNG) mantidas em memória entre reruns
+FIGURE_CACHE_MAX_BYTES = 64 * 1024**2
+FIGURE_DPI = 100
+
+
+class FigureCache:
+    """
+    Cache LRU de figuras renderizadas, limitado pelo total de bytes.
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._items.get(key)
+            if image is not None:
+                self._items.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= len(self._items.pop(key))
+            if len(image) > self.max_bytes:
+                return
+            self._items[key] = image
+            self.nbytes += len(image)
+            # Descartar as figuras usadas há mais tempo até caber no limite
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+figure_cache = FigureCache()
+
+
+def _figure_key(name, *data, **params):
+    """
+    Gera a chave do cache a partir do conteúdo dos dados e dos parâmetros.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=16)
+    for obj in data:
+        if isinstance(obj, pd.DataFrame):
+            digest.update(repr((list(obj.columns), list(obj.dtypes))).encode())
+            digest.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+        elif isinstance(obj, pd.Series):
+            digest.update(repr((obj.name, obj.dtype)).encode())
+            digest.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+        else:
+            digest.update(repr(obj).encode())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def render_figure(name, draw, *data, figsize=(10, 6), image_format="png", **params):
+    """
+    Devolve os bytes da figura desenhada por ``draw(fig, *data, **params)``.
+
+    A figura é criada com a API orientada a objetos (sem o estado global do
+    pyplot) e guardada em ``figure_cache``; em um acerto do cache o matplotlib
+    não é chamado.
+    """
+    key = _figure_key(
+        name, *data, figsize=figsize, image_format=image_format, **params
+    )
+    image = figure_cache.get(key)
+    if image is None:
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=FIGURE_DPI)
+        draw(fig, *data, **params)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=image_format)
+        image = buffer.getvalue()
+        figure_cache.put(key, image)
+    return image
+
+
+def show_figure(name, draw, *data, figsize=(10, 6), **params):
+    """
+    Exibe no Streamlit a figura renderizada (ou recuperada do cache).
+    """
+    st.image(render_figure(name, draw, *data, figsize=figsize, **params))
 
 @st.cache_data
 def prepare_combined_data(cotton_data, weather_data):
@@ -20,61 +139,135 @@ def prepare_combined_data(cotton_data, weather_data):
     cotton_filtered = cotton_data[cotton_data["Ano"].isin(common_years)]
     weather_filtered = weather_data[weather_data["Ano"].isin(common_years)]
 
+    # Agregar o clima na granularidade do algodão antes do merge
+    keys = [key for key in ("Ano", "Região/UF") if key in weather_filtered.columns]
+    weather_filtered = weather_means(weather_filtered, keys)
+
     # Fazer o merge dos dados
-    combined_data = pd.merge(cotton_filtered, weather_filtered, on="Ano")
+    combined_data = keyed_merge(
+        cotton_filtered, weather_filtered, on=keys, validate="many_to_one"
+    )
     return combined_data
 
 
-def plot_seasonal_trends(seasonal_data: pd.DataFrame):
+def _draw_seasonal_trends(fig, seasonal_data, hue):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.lineplot(data=seasonal_data, x="Ano", y="temp_avg", hue=hue, ax=ax)
+    ax.set_title("Tendências Sazonais de Temperatura Média")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Temperatura Média (°C)")
+
+
+def plot_seasonal_trends(seasonal_data: pd.DataFrame, hue="Estacao"):
+    """
+    Plota tendências sazonais por estação do ano ou janela de plantio.
+    """
+    show_figure("seasonal_trends", _draw_seasonal_trends, seasonal_data, hue=hue)
+
+
+@lru_cache(maxsize=8)
+def _map_geojson(geojson_path, mtime, tolerance, decimals, id_field):
     """
-    Plota tendências sazonais.
+    Lê, simplifica e serializa os limites estaduais (uma vez por arquivo).
     """
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=seasonal_data, x="Ano", y="temp_avg", hue="Estacao")
-    plt.title("Tendências Sazonais de Temperatura Média")
-    plt.xlabel("Ano")
-    plt.ylabel("Temperatura Média (°C)")
-    st.pyplot(plt)
+    import geopandas as gpd
+
+    states = gpd.read_file(geojson_path)[[id_field, "geometry"]]
+    if states.crs is not None:
+        states = states.to_crs(epsg=4326)
+
+    geometry = states.geometry
+    if tolerance:
+        geometry = geometry.simplify(tolerance, preserve_topology=True)
+    if decimals is not None:
+        geometry = geometry.set_precision(10.0**-decimals)
+    states = states.set_geometry(geometry)
+
+    # Apenas o id de cada feição (usado em key_on) e JSON sem espaços
+    payload = json.loads(states.set_index(id_field).to_json(drop_id=False))
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def load_map_geojson(
+    geojson_path,
+    tolerance=MAP_SIMPLIFY_TOLERANCE,
+    decimals=MAP_COORDINATE_DECIMALS,
+    id_field="id",
+) -> str:
+    """
+    Devolve o GeoJSON compacto dos estados para o mapa coroplético.
+
+    As geometrias são simplificadas com ``tolerance`` (graus), as coordenadas
+    arredondadas para ``decimals`` casas e as propriedades descartadas, exceto o
+    id. O resultado fica em memória enquanto o arquivo não mudar (mtime).
+    """
+    return _map_geojson(
+        geojson_path, os.path.getmtime(geojson_path), tolerance, decimals, id_field
+    )
+
 
+def regional_map(
+    regional_data,
+    geojson_path,
+    value_col="Area_Plantada",
+    legend_name="Área Plantada (ha)",
+    tolerance=MAP_SIMPLIFY_TOLERANCE,
+) -> "folium.Map":
+    """
+    Cria o mapa coroplético das regiões, focado no Brasil.
 
-def plot_regional_map(regional_data, geojson_path):
+    ``value_col`` escolhe a coluna colorida no mapa (ex.: a área prevista). Os
+    limites estaduais vêm de ``load_map_geojson``, simplificados com
+    ``tolerance``.
+    """
+    import folium
+
+    # Renomear colunas no regional_data para corresponder ao GeoJSON
+    if "Região/UF" in regional_data.columns:
+        regional_data = regional_data.rename(columns={"Região/UF": "id"})
+
+    # Carregar o GeoJSON simplificado (em cache entre reruns)
+    geo_data = load_map_geojson(geojson_path, tolerance=tolerance)
+
+    # Criar o mapa centrado no Brasil
+    m = folium.Map(location=[-14.235, -51.9253], zoom_start=4)
+
+    # Adicionar o mapa coroplético
+    folium.Choropleth(
+        geo_data=geo_data,
+        name="choropleth",
+        data=regional_data,
+        columns=["id", value_col],  # Usar a coluna 'id' e a coluna de valores
+        key_on="feature.id",  # Ajustar para usar o campo 'id' do GeoJSON
+        fill_color="YlGn",
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name=legend_name,
+    ).add_to(m)
+
+    # Adicionar controle de camadas
+    folium.LayerControl().add_to(m)
+    return m
+
+
+def plot_regional_map(
+    regional_data,
+    geojson_path,
+    value_col="Area_Plantada",
+    legend_name="Área Plantada (ha)",
+    tolerance=MAP_SIMPLIFY_TOLERANCE,
+):
     """
     Plota o mapa das melhores regiões para plantio de algodão, focado no Brasil.
     """
+    from streamlit_folium import st_folium
+
     try:
-        # Renomear colunas no regional_data para corresponder ao GeoJSON
-        if "Região/UF" in regional_data.columns:
-            regional_data = regional_data.rename(columns={"Região/UF": "id"})
-
-        # Verificar as colunas após o rename
-        #print("Colunas no regional_data após ajuste:", regional_data.columns)
-
-        # Carregar o GeoJSON
-        brazil_geo = gpd.read_file(geojson_path)
-        #print("Colunas no GeoJSON:", brazil_geo.columns)
-
-        # Verificar se as chaves do merge correspondem
-        #print("IDs no GeoJSON:", brazil_geo["id"].unique())
-        #print("IDs no regional_data:", regional_data["id"].unique())
-
-        # Criar o mapa centrado no Brasil
-        m = folium.Map(location=[-14.235, -51.9253], zoom_start=4)
-
-        # Adicionar o mapa coroplético
-        folium.Choropleth(
-            geo_data=geojson_path,
-            name="choropleth",
-            data=regional_data,
-            columns=["id", "Area_Plantada"],  # Usar a coluna 'id' e 'Area_Plantada'
-            key_on="feature.id",  # Ajustar para usar o campo 'id' do GeoJSON
-            fill_color="YlGn",
-            fill_opacity=0.7,
-            line_opacity=0.2,
-            legend_name="Área Plantada (ha)",
-        ).add_to(m)
-
-        # Adicionar controle de camadas
-        folium.LayerControl().add_to(m)
+        m = regional_map(
+            regional_data, geojson_path, value_col, legend_name, tolerance
+        )
 
         # Exibir o mapa no Streamlit
         st_folium(m, width=800, height=600)
@@ -143,67 +336,80 @@ def add_coordinates_to_regions(regional_data):
     return regional_data
 
 
-def plot_correlation_heatmap(cotton_data, weather_data):
+def plot_correlation_heatmap(cotton_data, weather_data, corr_matrix=None):
     """
     Plota um mapa de calor de correlação com melhorias de nomeclatura e design.
+
+    Aceita a matriz já calculada por ``correlation_matrix`` para não refazer a
+    junção e o cálculo.
     """
     try:
-        # Combinar os dados
-        combined_data = cotton_data.merge(
-            weather_data, on=["Ano", "Região/UF"], how="inner"
-        )
-
-        # Selecionar apenas colunas numéricas
-        numeric_data = combined_data.select_dtypes(include=["float64", "int64"])
-
         # Calcular a matriz de correlação
-        corr_matrix = numeric_data.corr()
-
-        # Renomear variáveis para maior clareza
-        rename_dict = {
-            "temp_max": "Temperatura Máxima (°C)",
-            "temp_avg": "Temperatura Média (°C)",
-            "temp_min": "Temperatura Mínima (°C)",
-            "hum_max": "Umidade Máxima (%)",
-            "hum_min": "Umidade Mínima (%)",
-            "rain_max": "Precipitação Máxima (mm)",
-            "rad_max": "Radiação Máxima (W/m²)",
-            "wind_avg": "Velocidade Média do Vento (m/s)",
-            "wind_max": "Velocidade Máxima do Vento (m/s)",
-            "Area_Plantada": "Área Plantada (ha)",
-            "Ano": "Ano",
-        }
-        corr_matrix = corr_matrix.rename(index=rename_dict, columns=rename_dict)
+        if corr_matrix is None:
+            corr_matrix = correlation_matrix(cotton_data, weather_data)
 
-        # Plotar o mapa de calor
-        plt.figure(figsize=(12, 10))
-        sns.heatmap(
+        # Plotar e exibir o mapa de calor no Streamlit
+        show_figure(
+            "correlation_heatmap",
+            _draw_correlation_heatmap,
             corr_matrix,
-            annot=True,  # Exibe os valores nas células
-            fmt=".2f",
-            cmap="coolwarm",  # Paleta de cores
-            cbar=True,
-            square=True,  # Células quadradas
-            linewidths=0.5,
+            figsize=(12, 10),
         )
-        plt.title(
-            "Mapa de Calor da Correlação entre Variáveis Climáticas e Área Plantada",
-            fontsize=14,
-        )
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-
-        # Exibir o gráfico no Streamlit
-        st.pyplot(plt)
-        plt.close()
     except Exception as e:
         st.error(f"Erro ao gerar mapa de calor: {e}")
 
 
+def _draw_correlation_heatmap(fig, corr_matrix):
+    import seaborn as sns
+
+    # Renomear variáveis para maior clareza
+    rename_dict = {
+        "temp_max": "Temperatura Máxima (°C)",
+        "temp_avg": "Temperatura Média (°C)",
+        "temp_min": "Temperatura Mínima (°C)",
+        "hum_max": "Umidade Máxima (%)",
+        "hum_min": "Umidade Mínima (%)",
+        "rain_max": "Precipitação Máxima (mm)",
+        "rad_max": "Radiação Máxima (W/m²)",
+        "wind_avg": "Velocidade Média do Vento (m/s)",
+        "wind_max": "Velocidade Máxima do Vento (m/s)",
+        "Area_Plantada": "Área Plantada (ha)",
+        "Ano": "Ano",
+    }
+    corr_matrix = corr_matrix.rename(index=rename_dict, columns=rename_dict)
+
+    ax = fig.subplots()
+    sns.heatmap(
+        corr_matrix,
+        annot=True,  # Exibe os valores nas células
+        fmt=".2f",
+        cmap="coolwarm",  # Paleta de cores
+        cbar=True,
+        square=True,  # Células quadradas
+        linewidths=0.5,
+        ax=ax,
+    )
+    ax.set_title(
+        "Mapa de Calor da Correlação entre Variáveis Climáticas e Área Plantada",
+        fontsize=14,
+    )
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    fig.tight_layout()
+
+
 def plot_climatic_influence(correlations: pd.Series):
     """
     Plota as variáveis climáticas mais influentes com nomes mais descritivos.
     """
+    # Criar e exibir o gráfico no Streamlit
+    show_figure("climatic_influence", _draw_climatic_influence, correlations)
+
+
+def _draw_climatic_influence(fig, correlations):
+    import seaborn as sns
+
     # Renomear variáveis para facilitar a leitura
     rename_dict = {
         "temp_max": "Temperatura Máxima (°C)",
@@ -225,31 +431,36 @@ def plot_climatic_influence(correlations: pd.Series):
     correlations = correlations.rename(index=rename_dict)  # Renomear variáveis
     correlations = correlations.sort_values(ascending=False)  # Ordenar por correlação
 
-    # Criar o gráfico
-    plt.figure(figsize=(10, 6))
+    ax = fig.subplots()
     sns.barplot(
-        x=correlations.values, y=correlations.index, hue=correlations.index, dodge=False
+        x=correlations.values,
+        y=correlations.index,
+        hue=correlations.index,
+        dodge=False,
+        ax=ax,
     )
-    plt.title("Correlação entre Variáveis Climáticas e Área Plantada de Algodão")
-    plt.xlabel("Correlação")
-    plt.ylabel("Variáveis Climáticas")
-    plt.grid(axis="x", linestyle="--", alpha=0.7)
-    plt.tight_layout()
+    ax.set_title("Correlação entre Variáveis Climáticas e Área Plantada de Algodão")
+    ax.set_xlabel("Correlação")
+    ax.set_ylabel("Variáveis Climáticas")
+    ax.grid(axis="x", linestyle="--", alpha=0.7)
+    fig.tight_layout()
+
+
+def _draw_historical_trends(fig, historical_trends):
+    import seaborn as sns
 
-    # Exibir o gráfico no Streamlit
-    st.pyplot(plt)
+    ax = fig.subplots()
+    sns.lineplot(data=historical_trends, x="Ano", y="Area_Planted", ax=ax)
+    ax.set_title("Tendências Históricas da Área Plantada")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Área Plantada (ha)")
 
 
 def plot_historical_trends(historical_trends: pd.DataFrame):
     """
     Plota as tendências históricas na área plantada.
     """
-    plt.figure(figsize=(10, 6))
-    sns.lineplot(data=historical_trends, x="Ano", y="Area_Planted")
-    plt.title("Tendências Históricas da Área Plantada")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (ha)")
-    st.pyplot(plt)
+    show_figure("historical_trends", _draw_historical_trends, historical_trends)
 
 
 def plot_scatter(cotton_data: pd.DataFrame, weather_data: pd.DataFrame):
@@ -277,59 +488,223 @@ def plot_scatter(cotton_data: pd.DataFrame, weather_data: pd.DataFrame):
     cotton_filtered = cotton_data[cotton_data["Ano"].isin(common_years)]
     weather_filtered = weather_data[weather_data["Ano"].isin(common_years)]
 
+    # Agregar o clima na granularidade do algodão antes do merge
+    keys = [key for key in ("Ano", "Região/UF") if key in weather_filtered.columns]
+    weather_filtered = weather_means(weather_filtered, keys)
+
     # Fazer o merge dos dados
-    combined_data = pd.merge(cotton_filtered, weather_filtered, on="Ano")
+    combined_data = keyed_merge(
+        cotton_filtered, weather_filtered, on=keys, validate="many_to_one"
+    )
+
+    # Gerar scatterplot (agregado em grade quando há muitos pontos)
+    fig = point_cloud_figure(
+        combined_data,
+        "temp_avg",
+        "Area_Planted",
+        title="Dispersão: Temperatura Média vs Área Plantada",
+        labels={
+            "temp_avg": "Temperatura Média (°C)",
+            "Area_Planted": "Área Plantada (ha)",
+        },
+    )
+    st.plotly_chart(fig)
+
 
-    # Amostrar dados para melhorar desempenho (exemplo: 20%)
-    if len(combined_data) > 10000:
-        combined_data = combined_data.sample(frac=0.2, random_state=42)
+def bin_points(data, x_col, y_col, color_col=None, bins=SCATTER_BINS):
+    """
+    Agrega uma nuvem de pontos em uma grade 2D.
 
-    # Gerar scatterplot
-    plt.figure(figsize=(8, 5))
-    plt.scatter(combined_data["temp_avg"], combined_data["Area_Planted"], alpha=0.7)
-    plt.title("Dispersão: Temperatura Média vs Área Plantada")
-    plt.xlabel("Temperatura Média (°C)")
-    plt.ylabel("Área Plantada (ha)")
-    plt.grid(True)
-    st.pyplot(plt)
+    Devolve uma linha por célula não vazia, com o centro da célula em ``x_col`` e
+    ``y_col``, o número de pontos em "Contagem" e, se informado, a média de
+    ``color_col``. O tamanho do resultado é limitado por ``bins`` × ``bins``.
+    """
+    points = data[[x_col, y_col]].to_numpy(dtype="float64")
+    valid = np.isfinite(points).all(axis=1)
+    if color_col is not None:
+        color = data[color_col].to_numpy(dtype="float64")
+        valid &= np.isfinite(color)
+        color = color[valid]
+    x, y = points[valid, 0], points[valid, 1]
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    ix, iy = np.nonzero(counts)
+    binned = pd.DataFrame(
+        {
+            x_col: (x_edges[ix] + x_edges[ix + 1]) / 2,
+            y_col: (y_edges[iy] + y_edges[iy + 1]) / 2,
+            "Contagem": counts[ix, iy].astype("int64"),
+        }
+    )
+    if color_col is not None:
+        sums, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=color)
+        binned[color_col] = sums[ix, iy] / counts[ix, iy]
+    return binned
+
+
+def lttb_indices(x, y, max_points=LINE_MAX_POINTS):
+    """
+    Seleciona os índices de uma série pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, o ponto
+    que forma o maior triângulo com o escolhido no balde anterior e a média do
+    balde seguinte, preservando picos e vales da série.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype("int64")
+    selected = np.empty(max_points, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample_line(data, x_col, y_col, max_points=LINE_MAX_POINTS):
+    """
+    Reduz uma série para no máximo ``max_points`` pontos por LTTB.
+    """
+    if len(data) <= max_points:
+        return data
+    data = data.sort_values(x_col)
+    return data.iloc[lttb_indices(data[x_col], data[y_col], max_points)]
+
+
+def point_cloud_figure(
+    data,
+    x_col,
+    y_col,
+    color_col=None,
+    title=None,
+    labels=None,
+    threshold=POINT_RENDER_THRESHOLD,
+    bins=SCATTER_BINS,
+    color_scale="Viridis",
+):
+    """
+    Cria um gráfico de dispersão Plotly de custo limitado.
+
+    Até ``threshold`` pontos, desenha cada ponto. Acima disso, agrega os pontos
+    com ``bin_points`` e desenha as células em WebGL, com o tamanho do marcador
+    proporcional à contagem e a cor pela média de ``color_col``; o número de
+    marcadores enviados ao navegador fica limitado a ``bins`` × ``bins``.
+    """
+    import plotly.express as px
+
+    if len(data) <= threshold:
+        fig = px.scatter(
+            data,
+            x=x_col,
+            y=y_col,
+            color=color_col,
+            color_continuous_scale=color_scale,
+            title=title,
+            labels=labels,
+        )
+        fig.update_traces(marker=dict(size=8, opacity=0.7))
+        return fig
+
+    binned = bin_points(data, x_col, y_col, color_col, bins)
+    fig = px.scatter(
+        binned,
+        x=x_col,
+        y=y_col,
+        color=color_col,
+        size="Contagem",
+        size_max=18,
+        color_continuous_scale=color_scale,
+        hover_data=["Contagem"],
+        title=f"{title} ({len(data):,} pontos agregados)" if title else None,
+        labels=labels,
+        render_mode="webgl",
+    )
+    fig.update_traces(marker=dict(opacity=0.8))
+    return fig
 
 
 def plot_interactive_scatter(data, x_col, y_col, title, x_label, y_label):
     """
     Cria um gráfico de dispersão interativo com Plotly.
     """
-    fig = px.scatter(data, x=x_col, y=y_col, title=title, labels={x_col: x_label, y_col: y_label})
-    fig.update_traces(marker=dict(size=10, opacity=0.7))
+    fig = point_cloud_figure(
+        data, x_col, y_col, title=title, labels={x_col: x_label, y_col: y_label}
+    )
     st.plotly_chart(fig)
 
 def plot_interactive_line(data, x_col, y_col, title, x_label, y_label):
     """
     Cria um gráfico de linha interativo com Plotly.
     """
+    import plotly.express as px
+
+    data = downsample_line(data, x_col, y_col)
     fig = px.line(data, x=x_col, y=y_col, title=title, labels={x_col: x_label, y_col: y_label})
     st.plotly_chart(fig)
 
 
-def plot_historical_trends_with_prediction(historical_trends, predicted_areas):
-    plt.figure(figsize=(10, 6))
-    plt.plot(
+def _draw_trends_with_prediction(fig, historical_trends, predicted_areas):
+    ax = fig.subplots()
+    ax.plot(
         historical_trends["Ano"],
         historical_trends["Area_Planted"],
         label="Histórico",
         marker="o",
         color="blue",
     )
-    plt.plot(
+    ax.plot(
         predicted_areas["Ano"],
         predicted_areas["Area_Planted_Predicted"],
         label="Previsão",
         linestyle="--",
         color="orange",
     )
-    plt.title("Tendências Históricas e Previsão da Área Plantada")
-    plt.xlabel("Ano")
-    plt.ylabel("Área Plantada (ha)")
-    plt.legend()
-    plt.grid()
-    st.pyplot(plt)
-    plt.close()
+    ax.set_title("Tendências Históricas e Previsão da Área Plantada")
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Área Plantada (ha)")
+    ax.legend()
+    ax.grid()
+
+
+def plot_historical_trends_with_prediction(historical_trends, predicted_areas):
+    """
+    Plota a série histórica da área plantada junto com a previsão.
+    """
+    show_figure(
+        "trends_with_prediction",
+        _draw_trends_with_prediction,
+        historical_trends,
+        predicted_areas,
+    )
+
+
+# Figuras disponíveis fora do Streamlit (ex.: relatórios em lote):
+# nome -> (função de desenho, tamanho)
+FIGURES = {
+    "seasonal_trends": (_draw_seasonal_trends, (10, 6)),
+    "correlation_heatmap": (_draw_correlation_heatmap, (12, 10)),
+    "climatic_influence": (_draw_climatic_influence, (10, 6)),
+    "historical_trends": (_draw_historical_trends, (10, 6)),
+    "trends_with_prediction": (_draw_trends_with_prediction, (10, 6)),
+}
+
+
+def figure_png(name, *data, **params) -> bytes:
+    """
+    Renderiza uma das figuras de ``FIGURES`` em PNG, sem chamadas ao Streamlit.
+    """
+    draw, figsize = FIGURES[name]
+    return render_figure(name, draw, *data, figsize=figsize, **params)
@@ -0,0 +1,585 @@
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from analysis import build_weather_cube, combine_weather_cubes
+from data_cleaning import apply_compact_schema, iter_weather_chunks
+
+
+# Versão do layout do repositório particionado; incremente ao mudar o formato
+STORE_VERSION = 5
+
+# Chave de um registro diário e dimensões do pré-agregado por estação
+RECORD_KEYS = ["DATA", "ESTACAO"]
+STATION_CUBE_KEYS = ["Ano", "Ano_Safra", "Estacao", "Janela_Plantio", "ESTACAO"]
+
+# Arquivo base e arquivos incrementais (novos dias/estações) na origem
+WEATHER_BASE_FILE = "weather_sum_all.csv"
+WEATHER_DELTA_PATTERN = "weather_delta_*.csv"
+
+MANIFEST_FILE = "manifest.json"
+AGGREGATES_FILE = "aggregates.parquet"
+
+# Rótulo da partição de estações sem UF conhecida
+UNKNOWN_REGION = "desconhecida"
+
+
+class LocalDirectorySource:
+    """
+    Origem dos arquivos climáticos em um diretório local (testes, ambientes
+    sem acesso à internet ou espelho do Drive).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def list_files(self, pattern: str) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(fnmatch.filter(os.listdir(self.directory), pattern))
+
+    def fetch(self, name: str, download_dir: str) -> str:
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo climático não encontrado: {path}")
+        return path
+
+
+class GoogleDriveSource:
+    """
+    Origem dos arquivos climáticos no Google Drive ({nome do arquivo: ID}).
+    """
+
+    def __init__(self, file_ids: dict):
+        self.file_ids = dict(file_ids)
+
+    def list_files(self, pattern: str) -> list:
+        return sorted(fnmatch.filter(self.file_ids, pattern))
+
+    def fetch(self, name: str, download_dir: str) -> str:
+        import gdown
+
+        path = os.path.join(download_dir, name)
+        if not os.path.exists(path):  # Baixa apenas se o arquivo não existir
+            os.makedirs(download_dir, exist_ok=True)
+            url = f"https://drive.google.com/uc?id={self.file_ids[name]}"
+            gdown.download(url, path, quiet=False)
+        return path
+
+
+def _write_parquet(data: pd.DataFrame, path: str) -> None:
+    """
+    Grava um arquivo Parquet de forma atômica.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    data.to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, path)
+
+
+def source_fingerprint(filepath: str) -> str:
+    """
+    Assinatura de um arquivo da origem pelo caminho, tamanho e mtime (barata,
+    sem ler o conteúdo).
+    """
+    stat = os.stat(filepath)
+    key = (
+        f"{os.path.abspath(filepath)}:{stat.st_size}:{stat.st_mtime_ns}:"
+        f"{STORE_VERSION}"
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def content_fingerprint(filepath: str) -> str:
+    """
+    Assinatura de um arquivo da origem pelo conteúdo; identifica o arquivo no
+    manifesto mesmo que ele seja baixado de novo.
+    """
+    digest = hashlib.sha1(f"{STORE_VERSION}:".encode("utf-8"))
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def read_manifest(store_dir: str) -> dict:
+    """
+    Lê o manifesto do repositório (colunas, partições, arquivos ingeridos e
+    revisão).
+
+    ``files`` é indexado pelo nome do arquivo na origem; cada entrada guarda o
+    resumo da ingestão e as assinaturas do conteúdo (``conteudo``) e do
+    caminho/tamanho/mtime (``origem``).
+    """
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {
+            "version": STORE_VERSION,
+            "revision": 0,
+            "columns": None,
+            "partition_by": ["ano"],
+            "regions": {},
+            "files": {},
+        }
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError(
+            f"Repositório climático na versão {manifest.get('version')}; "
+            f"esperada {STORE_VERSION}. Apague {store_dir} para reconstruí-lo."
+        )
+    return manifest
+
+
+def _clear_store(store_dir: str) -> None:
+    """
+    Apaga as partições, o pré-agregado e os arquivos do manifesto, preservando
+    os arquivos baixados; o repositório é reconstruído a partir dos arquivos da
+    origem. A revisão continua crescendo, pois os caches do app são indexados
+    por ela.
+    """
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    revision = 0
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            revision = json.load(f).get("revision", 0)
+    for entry in os.listdir(store_dir):
+        if entry == "downloads":
+            continue
+        stale = os.path.join(store_dir, entry)
+        if os.path.isdir(stale):
+            shutil.rmtree(stale)
+        else:
+            os.remove(stale)
+    if revision:
+        manifest = read_manifest(store_dir)
+        manifest["revision"] = revision
+        _write_manifest(manifest, store_dir)
+
+
+def _discard_stale_store(store_dir: str) -> None:
+    """
+    Apaga um repositório gravado em outra versão do layout.
+    """
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        if json.load(f).get("version") == STORE_VERSION:
+            return
+    _clear_store(store_dir)
+
+
+def _write_manifest(manifest: dict, store_dir: str) -> None:
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _region_label(region) -> str:
+    if region is None or pd.isna(region):
+        return UNKNOWN_REGION
+    return str(region).replace("/", "-")
+
+
+def _partition_dir(store_dir: str, year: int, region=None) -> str:
+    path = os.path.join(store_dir, f"ano={year}")
+    return path if region is None else os.path.join(path, f"uf={region}")
+
+
+def store_years(store_dir: str) -> list:
+    """
+    Lista os anos com partições no repositório.
+    """
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        int(entry.split("=", 1)[1])
+        for entry in os.listdir(store_dir)
+        if entry.startswith("ano=")
+    )
+
+
+def _partition_files(store_dir: str, year: int, regions=None) -> list:
+    """
+    Lista os arquivos de um ano; com ``regions``, apenas os das partições de UF.
+    """
+    directory = _partition_dir(store_dir, year)
+    if regions is not None:
+        directories = [_partition_dir(store_dir, year, label) for label in regions]
+    else:
+        directories = [root for root, _, _ in os.walk(directory)]
+    return sorted(
+        os.path.join(path, entry)
+        for path in directories
+        if os.path.isdir(path)
+        for entry in os.listdir(path)
+        if entry.endswith(".parquet")
+    )
+
+
+def _stored_keys(store_dir: str, year: int, dates: pd.Series) -> pd.MultiIndex:
+    """
+    Lê do disco as chaves já armazenadas em um ano, restritas ao intervalo de
+    ``dates``; as estatísticas do Parquet descartam os arquivos fora dele.
+    """
+    filters = [("DATA", ">=", dates.min()), ("DATA", "<=", dates.max())]
+    parts = [
+        pd.read_parquet(path, columns=RECORD_KEYS, filters=filters)
+        for path in _partition_files(store_dir, year)
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.MultiIndex.from_arrays([[], []], names=RECORD_KEYS)
+    keys = pd.concat(parts, ignore_index=True)
+    keys["ESTACAO"] = keys["ESTACAO"].astype(str)
+    return pd.MultiIndex.from_frame(keys)
+
+
+def _record_keys(chunk: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays(
+        [chunk["DATA"], chunk["ESTACAO"].astype(str)], names=RECORD_KEYS
+    )
+
+
+def _validate_columns(columns: list, manifest: dict, name: str) -> None:
+    """
+    Verifica se o arquivo tem as mesmas colunas do repositório.
+    """
+    expected = manifest["columns"]
+    if expected is None:
+        return
+    missing = sorted(set(expected) - set(columns))
+    extra = sorted(set(columns) - set(expected))
+    if missing or extra:
+        raise ValueError(
+            f"{name} não segue o esquema do repositório "
+            f"(faltando: {missing}, inesperadas: {extra})."
+        )
+
+
+def load_station_cube(store_dir: str) -> pd.DataFrame:
+    """
+    Carrega o pré-agregado por estação (Ano × Estacao × ESTACAO × variável).
+
+    Returns:
+        pd.DataFrame: Cubo no formato de ``build_weather_cube``, ou None se o
+        repositório ainda não tiver dados.
+    """
+    path = os.path.join(store_dir, AGGREGATES_FILE)
+    if not os.path.exists(path):
+        return None
+    flat = pd.read_parquet(path).set_index(STATION_CUBE_KEYS)
+    flat.columns = pd.MultiIndex.from_tuples(
+        [tuple(col.rsplit("|", 1)) for col in flat.columns]
+    )
+    return flat
+
+
+def _write_station_cube(cube: pd.DataFrame, store_dir: str) -> None:
+    flat = cube.copy()
+    flat.columns = [f"{var}|{stat}" for var, stat in flat.columns]
+    _write_parquet(flat.reset_index(), os.path.join(store_dir, AGGREGATES_FILE))
+
+
+def _rebuild_station_cube(store_dir: str, years) -> None:
+    """
+    Recalcula o pré-agregado por estação dos anos indicados a partir das
+    partições em disco, um arquivo por vez; os demais anos são mantidos.
+    """
+    years = [int(year) for year in years]
+    cube = load_station_cube(store_dir)
+    if cube is not None:
+        cube = cube[~cube.index.get_level_values("Ano").isin(years)]
+    for year in years:
+        for path in _partition_files(store_dir, year):
+            part = build_weather_cube(pd.read_parquet(path), keys=STATION_CUBE_KEYS)
+            cube = part if cube is None else combine_weather_cubes([cube, part])
+
+    if cube is not None and not cube.empty:
+        _write_station_cube(cube, store_dir)
+    elif os.path.exists(os.path.join(store_dir, AGGREGATES_FILE)):
+        os.remove(os.path.join(store_dir, AGGREGATES_FILE))
+
+
+def _remove_file_rows(store_dir: str, entry: dict) -> None:
+    """
+    Remove as partições gravadas por um arquivo ingerido (entrada do manifesto)
+    e recalcula o pré-agregado dos anos afetados.
+    """
+    prefix = f"part-{entry['conteudo'][:12]}-"
+    for year in entry["anos"]:
+        for path in _partition_files(store_dir, year):
+            if os.path.basename(path).startswith(prefix):
+                os.remove(path)
+    _rebuild_station_cube(store_dir, entry["anos"])
+
+
+def ingest_weather_file(
+    filepath: str,
+    store_dir: str,
+    name: str = None,
+    chunksize: int = 500_000,
+    station_to_region=None,
+) -> dict:
+    """
+    Ingere um arquivo climático (base ou incremental) no repositório particionado.
+
+    O arquivo é lido em blocos e validado contra o esquema do repositório;
+    registros (DATA, ESTACAO) já armazenados são descartados e os novos são
+    gravados como novas partições por ano, sem reescrever as existentes. Cada
+    bloco é comparado com as partições em disco (apenas no intervalo de datas
+    do bloco), de modo que a memória depende de ``chunksize`` e não do tamanho
+    do arquivo. O pré-agregado por estação é atualizado apenas com os registros
+    novos. Arquivos já ingeridos (mesmo conteúdo, com qualquer nome) são
+    ignorados; uma nova versão de um arquivo já ingerido (mesmo nome, outro
+    conteúdo) substitui as linhas da versão anterior, em vez de ser descartada
+    como duplicata delas.
+
+    Se ``station_to_region`` for informado na criação do repositório, as
+    partições passam a ser por ano e UF (``ano=AAAA/uf=XX``). A UF de cada
+    estação fica registrada no manifesto, de modo que arquivos posteriores caiam
+    nas mesmas partições.
+
+    Returns:
+        dict: Resumo com linhas lidas, novas, duplicadas e anos afetados.
+    """
+    try:
+        name = name or os.path.basename(filepath)
+        manifest = read_manifest(store_dir)
+        fingerprint = content_fingerprint(filepath)
+        for entry_name, entry in manifest["files"].items():
+            if entry["conteudo"] == fingerprint:
+                if entry_name == name:
+                    # Mesmo conteúdo com outro mtime: evita reler na próxima vez
+                    entry["origem"] = source_fingerprint(filepath)
+                    _write_manifest(manifest, store_dir)
+                return dict(entry, ignorado=True)
+
+        header = list(pd.read_csv(filepath, nrows=0).columns)
+        _validate_columns(header, manifest, name)
+
+        previous = manifest["files"].get(name)
+        if previous is not None:
+            # Arquivo corrigido: as linhas da versão anterior saem do repositório
+            _remove_file_rows(store_dir, previous)
+
+        if not manifest["files"] and station_to_region is not None:
+            manifest["partition_by"] = ["ano", "uf"]
+        by_region = "uf" in manifest["partition_by"]
+        regions = dict(manifest["regions"])
+        if by_region and station_to_region is not None:
+            # Estações já armazenadas mantêm a UF com que foram particionadas
+            regions = {**dict(station_to_region), **regions}
+
+        cube = None
+        written = []
+        years = set()
+        new_stations = set()
+        summary = {"arquivo": name, "linhas": 0, "novas": 0, "duplicadas": 0}
+        try:
+            for i, chunk in enumerate(iter_weather_chunks(filepath, chunksize)):
+                summary["linhas"] += len(chunk)
+                chunk = apply_compact_schema(chunk)
+
+                # Descartar registros já presentes no repositório (inclusive os
+                # gravados por blocos anteriores deste arquivo) ou no bloco
+                keys = _record_keys(chunk)
+                duplicated = keys.duplicated()
+                for year in chunk["Ano"].unique():
+                    in_year = (chunk["Ano"] == year).to_numpy()
+                    stored = _stored_keys(store_dir, year, chunk.loc[in_year, "DATA"])
+                    duplicated |= in_year & keys.isin(stored)
+                summary["duplicadas"] += int(duplicated.sum())
+                chunk = chunk[~duplicated]
+                if chunk.empty:
+                    continue
+
+                for year, part in chunk.groupby("Ano", observed=True):
+                    splits = [(None, part)]
+                    if by_region:
+                        stations = part["ESTACAO"].astype(str)
+                        labels = stations.map(regions).map(_region_label)
+                        splits = part.groupby(labels.to_numpy())
+                        new_stations.update(stations.unique())
+                    for label, split in splits:
+                        path = os.path.join(
+                            _partition_dir(store_dir, year, label),
+                            f"part-{fingerprint[:12]}-{i:05d}.parquet",
+                        )
+                        _write_parquet(split, path)
+                        written.append(path)
+                    years.add(int(year))
+
+                # Pré-agregado acumulado bloco a bloco (tamanho do cubo, não do
+                # arquivo)
+                chunk_cube = build_weather_cube(chunk, keys=STATION_CUBE_KEYS)
+                cube = (
+                    chunk_cube
+                    if cube is None
+                    else combine_weather_cubes([cube, chunk_cube])
+                )
+                summary["novas"] += len(chunk)
+        except Exception:
+            # Ingestão parcial: remove as partições gravadas por este arquivo
+            for path in written:
+                os.remove(path)
+            raise
+
+        if cube is not None:
+            current = load_station_cube(store_dir)
+            if current is not None:
+                cube = combine_weather_cubes([current, cube])
+            _write_station_cube(cube, store_dir)
+
+        summary["anos"] = sorted(years)
+        if manifest["columns"] is None:
+            manifest["columns"] = header
+        for station in sorted(new_stations - set(manifest["regions"])):
+            region = regions.get(station)
+            manifest["regions"][station] = None if pd.isna(region) else str(region)
+        manifest["files"][name] = dict(
+            summary, conteudo=fingerprint, origem=source_fingerprint(filepath)
+        )
+        manifest["revision"] += 1
+        _write_manifest(manifest, store_dir)
+
+        return dict(summary, ignorado=False)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao ingerir dados meteorológicos: {e}")
+
+
+def sync_weather_store(
+    source, store_dir: str, download_dir: str = None, station_to_region=None
+) -> list:
+    """
+    Sincroniza o repositório com a origem: ingere o arquivo base e depois cada
+    arquivo incremental ainda não visto ou alterado.
+
+    Um arquivo cujo caminho, tamanho e mtime (``source_fingerprint``) não
+    mudaram desde a última sincronização nem é relido. Se o conteúdo do arquivo
+    base mudar, o repositório é reconstruído (base e incrementais), já que os
+    incrementais foram deduplicados contra a versão anterior. Um repositório em
+    versão antiga do layout também é reconstruído.
+
+    ``source`` é qualquer objeto com ``list_files(padrão)`` e
+    ``fetch(nome, diretório)`` (``LocalDirectorySource`` ou ``GoogleDriveSource``).
+    ``station_to_region`` é repassado a ``ingest_weather_file``.
+
+    Returns:
+        list: Resumos de ``ingest_weather_file`` dos arquivos processados.
+    """
+    download_dir = download_dir or os.path.join(store_dir, "downloads")
+    _discard_stale_store(store_dir)
+    files = read_manifest(store_dir)["files"]
+
+    names = source.list_files(WEATHER_DELTA_PATTERN)
+    if not files or source.list_files(WEATHER_BASE_FILE):
+        names.insert(0, WEATHER_BASE_FILE)
+
+    summaries = []
+    for name in names:
+        path = source.fetch(name, download_dir)
+        entry = files.get(name)
+        # Arquivo inalterado desde a última sincronização: evita reler o conteúdo
+        if entry is not None and entry["origem"] == source_fingerprint(path):
+            continue
+        base_changed = (
+            name == WEATHER_BASE_FILE
+            and entry is not None
+            and entry["conteudo"] != content_fingerprint(path)
+        )
+        if base_changed:
+            _clear_store(store_dir)
+            return sync_weather_store(
+                source, store_dir, download_dir, station_to_region
+            )
+        summaries.append(
+            ingest_weather_file(
+                path, store_dir, name=name, station_to_region=station_to_region
+            )
+        )
+
+    return summaries
+
+
+def _empty_query_result(store_dir: str, columns=None) -> pd.DataFrame:
+    """
+    Resultado vazio com as colunas e tipos das partições gravadas (e não o
+    cabeçalho bruto do CSV guardado no manifesto).
+    """
+    import pyarrow.parquet as pq
+
+    for year in store_years(store_dir):
+        paths = _partition_files(store_dir, year)
+        if paths:
+            # Um lote de uma linha traz também as categorias gravadas
+            batch = next(pq.ParquetFile(paths[0]).iter_batches(1, columns=columns))
+            return apply_compact_schema(batch.to_pandas().iloc[:0])
+    return pd.DataFrame(columns=columns)
+
+
+def query_weather_store(
+    store_dir: str,
+    years=None,
+    regions=None,
+    columns=None,
+    station_to_region=None,
+) -> pd.DataFrame:
+    """
+    Consulta o repositório lendo apenas as partições e colunas necessárias.
+
+    O filtro de ``years`` seleciona os diretórios ``ano=AAAA``; o de ``regions``
+    seleciona as partições ``uf=XX`` quando o repositório é particionado por UF
+    ou, caso contrário, é convertido em um filtro de estações (via
+    ``station_to_region`` ou o mapeamento do manifesto) aplicado na leitura do
+    Parquet. ``columns`` restringe as colunas lidas do disco.
+    """
+    try:
+        manifest = read_manifest(store_dir)
+        if not manifest["files"]:
+            raise ValueError(f"Repositório climático vazio: {store_dir}")
+
+        selected_years = store_years(store_dir)
+        if years is not None:
+            wanted = {int(year) for year in years}
+            selected_years = [year for year in selected_years if year in wanted]
+
+        labels = None
+        filters = None
+        if regions is not None:
+            regions = set(regions)
+            if "uf" in manifest["partition_by"]:
+                labels = [_region_label(region) for region in regions]
+            else:
+                mapping = dict(station_to_region or manifest["regions"])
+                if not mapping:
+                    raise ValueError(
+                        "Filtro por região requer station_to_region ou um "
+                        "repositório particionado por UF."
+                    )
+                stations = sorted(
+                    station for station, region in mapping.items() if region in regions
+                )
+                filters = [("ESTACAO", "in", stations)] if stations else None
+                if not stations:
+                    selected_years = []
+
+        columns = list(dict.fromkeys(columns)) if columns is not None else None
+        parts = [
+            pd.read_parquet(path, columns=columns, filters=filters)
+            for year in selected_years
+            for path in _partition_files(store_dir, year, labels)
+        ]
+        if not parts:
+            return _empty_query_result(store_dir, columns)
+
+        return apply_compact_schema(pd.concat(parts, ignore_index=True))
+    except Exception as e:
+        raise RuntimeError(f"Erro ao consultar repositório climático: {e}")